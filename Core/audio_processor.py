@@ -6,11 +6,15 @@ Handles:
 - Audio transcription
 - Multiple audio formats
 - Timestamp extraction
+- In-memory PCM input (no intermediate .wav)
+- Batched VAD-segmented transcription for long recordings (faster-whisper)
 """
 
 from typing import Dict, Optional
 from pathlib import Path
 
+import numpy as np
+
 
 class AudioProcessor:
     """Process audio files with Whisper"""
@@ -24,25 +28,36 @@ class AudioProcessor:
         """
         self.model_size = model_size
         self.model = None
+        self.device = "cpu"
+        self._batched_pipeline = None  # faster-whisper, loaded on first transcribe_batched()
         
         try:
             import whisper
+            import torch
+            
+            # Pick the device once; the model stays there across transcribe() calls
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
             print(f"🔧 Loading Whisper model: {model_size}...")
-            self.model = whisper.load_model(model_size)
-            print(f"✅ Whisper model loaded: {model_size}")
+            self.model = whisper.load_model(model_size, device=self.device)
+            print(f"✅ Whisper model loaded: {model_size} ({self.device})")
         except ImportError:
             print("⚠️  Whisper not installed")
             print("   Install: uv add openai-whisper")
         except Exception as e:
             print(f"❌ Whisper error: {e}")
     
-    def transcribe(self, audio_path: str, language: str = None) -> Dict:
+    def transcribe(self, audio_path: Optional[str] = None, language: str = None,
+                   use_gpu: Optional[bool] = None,
+                   audio_array: Optional[np.ndarray] = None) -> Dict:
         """
-        Transcribe audio file
+        Transcribe audio file or decoded samples
         
         Args:
-            audio_path: Path to audio file
+            audio_path: Path to audio file (any format ffmpeg can decode)
             language: Language code ('en', 'fr', etc.) or None for auto-detect
+            use_gpu: Force GPU (True) or CPU (False); None keeps the current device
+            audio_array: 16 kHz mono float32 samples in [-1, 1], used instead of
+                audio_path (see load_pcm)
             
         Returns:
             Dictionary with transcription results
@@ -54,11 +69,18 @@ class AudioProcessor:
             }
         
         try:
-            # Transcribe
+            # Only move the model when the requested device differs
+            if use_gpu is not None:
+                device = "cuda" if use_gpu else "cpu"
+                if device != self.device:
+                    self.model = self.model.to(device)
+                    self.device = device
+            
+            # Transcribe (Whisper takes a path or a float32 array)
             result = self.model.transcribe(
-                audio_path,
+                audio_array if audio_array is not None else audio_path,
                 language=language,
-                fp16=False  # Disable FP16 for CPU compatibility
+                fp16=self.device == "cuda"  # FP16 is unsupported on CPU
             )
             
             return {
@@ -75,12 +97,120 @@ class AudioProcessor:
             }
         
         except Exception as e:
-            print(f"❌ Transcription error for {audio_path}: {e}")
+            print(f"❌ Transcription error for {audio_path or 'audio array'}: {e}")
             return {
                 'text': '',
                 'error': str(e)
             }
     
+    def transcribe_batched(self, audio_path: Optional[str] = None, language: str = None,
+                           batch_size: int = 16,
+                           audio_array: Optional[np.ndarray] = None) -> Dict:
+        """
+        Transcribe long audio in batches of VAD-detected speech chunks
+        
+        Uses faster-whisper's BatchedInferencePipeline: Silero VAD splits the
+        audio into ≤30s speech chunks which are decoded together, filling the
+        GPU instead of running one window at a time. Falls back to transcribe()
+        when faster-whisper isn't installed.
+        
+        Args:
+            audio_path: Path to audio file
+            language: Language code ('en', 'fr', etc.) or None for auto-detect
+            batch_size: Chunks decoded per forward pass
+            audio_array: 16 kHz mono float32 samples, used instead of audio_path
+            
+        Returns:
+            Dictionary with transcription results (same shape as transcribe())
+        """
+        pipeline = self._get_batched_pipeline()
+        if pipeline is None:
+            return self.transcribe(audio_path, language=language, audio_array=audio_array)
+        
+        try:
+            segments, info = pipeline.transcribe(
+                audio_array if audio_array is not None else audio_path,
+                language=language,
+                batch_size=batch_size
+            )
+            # segments is a generator; decoding happens while iterating
+            segments = [
+                {
+                    'start': seg.start,
+                    'end': seg.end,
+                    'text': seg.text.strip()
+                }
+                for seg in segments
+            ]
+            
+            return {
+                'text': ' '.join(seg['text'] for seg in segments if seg['text']),
+                'language': info.language or language,
+                'segments': segments
+            }
+        
+        except Exception as e:
+            print(f"❌ Batched transcription error for {audio_path or 'audio array'}: {e}")
+            return {
+                'text': '',
+                'error': str(e)
+            }
+    
+    def _get_batched_pipeline(self):
+        """Load the faster-whisper batched pipeline once, or None if unavailable"""
+        if self._batched_pipeline is None:
+            try:
+                from faster_whisper import WhisperModel, BatchedInferencePipeline
+            except ImportError:
+                print("⚠️  faster-whisper not installed, using sequential Whisper")
+                print("   Install: uv add faster-whisper")
+                self._batched_pipeline = False
+                return None
+            
+            try:
+                compute_type = "float16" if self.device == "cuda" else "int8"
+                model = WhisperModel(self.model_size, device=self.device, compute_type=compute_type)
+                self._batched_pipeline = BatchedInferencePipeline(model=model)
+                print(f"✅ Batched Whisper pipeline loaded: {self.model_size} ({self.device}, {compute_type})")
+            except Exception as e:
+                print(f"❌ faster-whisper error: {e}")
+                self._batched_pipeline = False
+        
+        return self._batched_pipeline or None
+    
+    @staticmethod
+    def load_pcm(media_path: str, sample_rate: int = 16000) -> Optional[np.ndarray]:
+        """
+        Decode the audio track of any media file straight from an ffmpeg pipe
+        
+        Nothing is written to disk, so a video's audio can go to transcribe()
+        without extracting a .wav first.
+        
+        Args:
+            media_path: Audio or video file
+            sample_rate: Output sample rate (Whisper expects 16000)
+            
+        Returns:
+            Mono float32 samples in [-1, 1], or None if ffmpeg fails
+        """
+        import subprocess
+        
+        cmd = [
+            'ffmpeg', '-nostdin', '-loglevel', 'error', '-i', str(media_path),
+            '-vn', '-f', 's16le', '-acodec', 'pcm_s16le',
+            '-ac', '1', '-ar', str(sample_rate), '-'
+        ]
+        try:
+            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+        except FileNotFoundError:
+            print("⚠️  ffmpeg not found on PATH")
+            return None
+        except subprocess.CalledProcessError as e:
+            print(f"❌ ffmpeg error for {media_path}: {e.stderr.decode(errors='replace').strip()}")
+            return None
+        
+        return np.frombuffer(proc.stdout, np.int16).astype(np.float32) / 32768.0
+    
     def get_audio_duration(self, audio_path: str) -> Optional[float]:
         """
         Get audio duration in seconds
@@ -8,35 +8,139 @@ Handles:
 - TXT files
 """
 
-from typing import Optional
+from typing import Optional, Iterator, List
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import atexit
+import io
+import multiprocessing
+import os
+
+
+_PDF_POOL = None
+# Page ranges are coarse, so a few workers already saturate the disk/parser
+_PDF_POOL_MAX_WORKERS = 4
+
+
+def _pdf_start_method() -> str:
+    """Start method in effect, without fixing it if the host app hasn't chosen yet"""
+    # get_all_start_methods() lists the platform default first
+    return (multiprocessing.get_start_method(allow_none=True)
+            or multiprocessing.get_all_start_methods()[0])
+
+
+def _pdf_pool_workers() -> int:
+    """Worker count for parallel PDF extraction (0 = extract serially)
+    
+    Only fork start-up is cheap enough. Under spawn (Windows, macOS) every
+    worker re-imports the caller's __main__, e.g. ingest_all_data with
+    torch/transformers, which costs far more than serial extraction saves.
+    """
+    if _pdf_start_method() != 'fork':
+        return 0
+    workers = min(os.cpu_count() or 1, _PDF_POOL_MAX_WORKERS)
+    return workers if workers > 1 else 0
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Module-level worker pool, created once to amortize process start-up"""
+    global _PDF_POOL
+    if _PDF_POOL is None:
+        # Explicit context: the default one would pin the global start method
+        _PDF_POOL = ProcessPoolExecutor(max_workers=_pdf_pool_workers(),
+                                        mp_context=multiprocessing.get_context(_pdf_start_method()))
+        atexit.register(_shutdown_pdf_pool)
+    return _PDF_POOL
+
+
+def _shutdown_pdf_pool():
+    """Stop the worker processes (registered with atexit)"""
+    global _PDF_POOL
+    if _PDF_POOL is not None:
+        _PDF_POOL.shutdown(wait=True)
+        _PDF_POOL = None
+
+
+def _extract_pdf_page_range(pdf_path: str, backend: str, start: int, stop: int) -> List[str]:
+    """Extract pages [start, stop) in a worker process (top-level so it pickles)"""
+    texts = []
+    if backend == 'pdfium':
+        import pypdfium2 as pdfium
+        
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            for i in range(start, stop):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_range() or "")
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+    else:
+        import PyPDF2
+        
+        with open(pdf_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            for i in range(start, stop):
+                texts.append(reader.pages[i].extract_text() or "")
+    return texts
 
 
 class DocumentProcessor:
     """Process various document formats"""
     
+    # Below this many pages, process start-up costs more than it saves
+    # (serial PDFium extraction runs at ~1-2 ms per text page)
+    PARALLEL_PDF_MIN_PAGES = 200
+    
     def __init__(self):
         """Initialize document processor"""
         self.pdf_available = False
+        self.pdf_backend = None
         self.docx_available = False
         
-        # Check PDF support
+        # Modules bound once here so extraction paths skip per-call imports
+        self._pdfium = None
+        self._pypdf2 = None
+        self._docx = None
+        
+        # Check PDF support (prefer the native PDFium backend)
         try:
-            import PyPDF2
+            import pypdfium2
+            self._pdfium = pypdfium2
             self.pdf_available = True
-            print("✅ PDF support: PyPDF2")
+            self.pdf_backend = 'pdfium'
+            print("✅ PDF support: pypdfium2")
         except ImportError:
-            print("⚠️  PyPDF2 not installed")
-            print("   Install: uv add pypdf2")
+            try:
+                import PyPDF2
+                self._pypdf2 = PyPDF2
+                self.pdf_available = True
+                self.pdf_backend = 'pypdf2'
+                print("✅ PDF support: PyPDF2")
+                print("   Faster backend: uv add pypdfium2")
+            except ImportError:
+                print("⚠️  No PDF library installed")
+                print("   Install: uv add pypdfium2")
         
         # Check DOCX support
         try:
             import docx
+            self._docx = docx
             self.docx_available = True
             print("✅ DOCX support: python-docx")
         except ImportError:
             print("⚠️  python-docx not installed")
             print("   Install: uv add python-docx")
+        
+        # Extension -> handler; register new formats here
+        self._handlers = {
+            '.pdf': self.extract_from_pdf,
+            '.docx': self.extract_from_docx,
+            '.doc': self.extract_from_docx,
+            '.txt': self.extract_from_txt,
+        }
     
     def extract_text(self, file_path: str) -> str:
         """
@@ -48,18 +152,51 @@ class DocumentProcessor:
         Returns:
             Extracted text
         """
-        path = Path(file_path)
-        extension = path.suffix.lower()
-        
-        if extension == '.pdf':
-            return self.extract_from_pdf(file_path)
-        elif extension in ['.docx', '.doc']:
-            return self.extract_from_docx(file_path)
-        elif extension == '.txt':
-            return self.extract_from_txt(file_path)
-        else:
+        extension = Path(file_path).suffix.lower()
+        handler = self._handlers.get(extension)
+        
+        if handler is None:
             print(f"⚠️  Unsupported format: {extension}")
             return ""
+        
+        return handler(file_path)
+    
+    def iter_pdf_pages(self, pdf_path: str) -> Iterator[str]:
+        """
+        Lazily yield the text of each PDF page
+        
+        Only one page is held in memory at a time, so callers can start
+        chunking/embedding page 1 while later pages are still being parsed.
+        
+        Args:
+            pdf_path: Path to PDF
+            
+        Yields:
+            Text of each page ("" for pages without a text layer)
+        """
+        if not self.pdf_available:
+            return
+        
+        if self.pdf_backend == 'pdfium':
+            pdf = self._pdfium.PdfDocument(pdf_path)
+            try:
+                for i in range(len(pdf)):
+                    page = pdf[i]
+                    textpage = page.get_textpage()
+                    try:
+                        yield textpage.get_text_range() or ""
+                    finally:
+                        textpage.close()
+                        page.close()
+            finally:
+                pdf.close()
+            return
+        
+        with open(pdf_path, 'rb') as file:
+            reader = self._pypdf2.PdfReader(file)
+            
+            for page in reader.pages:
+                yield page.extract_text() or ""
     
     def extract_from_pdf(self, pdf_path: str) -> str:
         """Extract text from PDF"""
@@ -67,30 +204,69 @@ class DocumentProcessor:
             return ""
         
         try:
-            import PyPDF2
+            if _pdf_pool_workers():
+                n_pages = self._count_pdf_pages(pdf_path)
+                if n_pages >= self.PARALLEL_PDF_MIN_PAGES:
+                    pages = self._extract_pdf_parallel(pdf_path, n_pages)
+                    if pages is not None:
+                        return "\n".join(pages)
             
-            text = []
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                
-                for page in reader.pages:
-                    text.append(page.extract_text())
+            buffer = io.StringIO()
+            for i, page_text in enumerate(self.iter_pdf_pages(pdf_path)):
+                if i:
+                    buffer.write("\n")
+                buffer.write(page_text)
             
-            return "\n".join(text)
+            return buffer.getvalue()
         
         except Exception as e:
             print(f"❌ PDF error for {pdf_path}: {e}")
             return ""
     
+    def _count_pdf_pages(self, pdf_path: str) -> int:
+        """Number of pages in a PDF"""
+        if self.pdf_backend == 'pdfium':
+            pdf = self._pdfium.PdfDocument(pdf_path)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+        
+        with open(pdf_path, 'rb') as file:
+            return len(self._pypdf2.PdfReader(file).pages)
+    
+    def _extract_pdf_parallel(self, pdf_path: str, n_pages: int) -> Optional[List[str]]:
+        """
+        Split a large PDF into page ranges across the process pool
+        
+        Each worker opens the document once and extracts a contiguous range,
+        so the file is parsed once per worker rather than once per page.
+        
+        Returns:
+            Page texts in order, or None if the pool is unavailable
+        """
+        workers = _pdf_pool_workers()
+        step = max(1, -(-n_pages // (workers * 2)))
+        ranges = [(start, min(start + step, n_pages)) for start in range(0, n_pages, step)]
+        
+        try:
+            pool = _get_pdf_pool()
+            futures = [
+                pool.submit(_extract_pdf_page_range, str(pdf_path), self.pdf_backend, start, stop)
+                for start, stop in ranges
+            ]
+            return [text for future in futures for text in future.result()]
+        except Exception as e:
+            print(f"⚠️  Parallel PDF extraction unavailable, falling back to serial: {e}")
+            return None
+    
     def extract_from_docx(self, docx_path: str) -> str:
         """Extract text from DOCX"""
         if not self.docx_available:
             return ""
         
         try:
-            import docx
-            
-            doc = docx.Document(docx_path)
+            doc = self._docx.Document(docx_path)
             text = []
             
             for paragraph in doc.paragraphs:
@@ -145,7 +321,7 @@ def test_document_processor():
     processor = DocumentProcessor()
     
     print("\n✅ Document processor initialized")
-    print(f"   PDF support: {processor.pdf_available}")
+    print(f"   PDF support: {processor.pdf_available} ({processor.pdf_backend})")
     print(f"   DOCX support: {processor.docx_available}")
     
     print("\n💡 To extract text:")
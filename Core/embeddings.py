@@ -7,18 +7,260 @@ Handles initialization and encoding for:
 - Images: CLIP (openai/clip-vit-base-patch32)
 """
 
-from typing import List, Union, Optional
+from typing import List, Union, Optional, Dict, Callable, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import contextlib
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
 import numpy as np
 import torch
 from pathlib import Path
 from PIL import Image
-from transformers import CLIPProcessor, CLIPModel
+from transformers import CLIPProcessor, CLIPModel, CLIPTokenizerFast
 
 try:
     import ollama as _ollama_lib
 except ImportError:
     _ollama_lib = None
 
+try:
+    from torchvision.transforms import v2 as _tv2
+except ImportError:
+    _tv2 = None
+
+
+_OLLAMA_CLIENT = None
+_OLLAMA_CLIENT_LOCK = threading.Lock()
+
+# (model name, device, dtype, compiled) -> (CLIPModel, CLIPProcessor, CLIPTokenizerFast)
+_CLIP_CACHE: Dict[tuple, tuple] = {}
+_CLIP_CACHE_LOCK = threading.Lock()
+
+
+def _get_ollama_client(timeout: float):
+    """Process-wide ollama.Client (its httpx connection pool is kept alive and shared)"""
+    global _OLLAMA_CLIENT
+    if _OLLAMA_CLIENT is None:
+        with _OLLAMA_CLIENT_LOCK:
+            if _OLLAMA_CLIENT is None:
+                _OLLAMA_CLIENT = _ollama_lib.Client(timeout=timeout)
+    return _OLLAMA_CLIENT
+
+
+def _l2_normalize_inplace(x: np.ndarray) -> np.ndarray:
+    """L2-normalize the rows of a float32 matrix in place (no temporaries)"""
+    sq = np.einsum('ij,ij->i', x, x)
+    np.sqrt(sq, out=sq)
+    sq += 1e-8
+    np.reciprocal(sq, out=sq)
+    x *= sq[:, None]
+    return x
+
+
+class DiskEmbeddingCache:
+    """Persistent SQLite cache of embeddings keyed by content hash
+    
+    Vectors are stored as float16 blobs (half the footprint of float32) and
+    promoted back to float32 on load. Rows are scoped by model name so that
+    switching models never serves stale vectors.
+    """
+    
+    # SQLite caps host parameters per statement (999 on older builds)
+    MAX_PARAMS = 900
+    
+    def __init__(self, db_path: Union[str, Path]):
+        """
+        Open (or create) the cache database
+        
+        Args:
+            db_path: Path to the SQLite file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                hash BLOB NOT NULL,
+                model TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (hash, model)
+            )
+        """)
+        self.conn.commit()
+    
+    def get_many(self, keys: List[bytes], model: str) -> Dict[bytes, np.ndarray]:
+        """Return cached float32 vectors for the keys that are present"""
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        
+        with self._lock:
+            for i in range(0, len(unique), self.MAX_PARAMS):
+                batch = unique[i:i + self.MAX_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT hash, dim, vector FROM embeddings "
+                    f"WHERE model = ? AND hash IN ({placeholders})",
+                    (model, *batch)
+                ).fetchall()
+                for key, dim, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float16)
+                    if vector.shape[0] == dim:
+                        found[bytes(key)] = vector.astype(np.float32)
+        
+        return found
+    
+    def put_many(self, items: Dict[bytes, np.ndarray], model: str):
+        """Write-through a batch of vectors"""
+        if not items:
+            return
+        
+        rows = [
+            (key, model, int(vector.shape[-1]), np.asarray(vector, dtype=np.float16).tobytes())
+            for key, vector in items.items()
+        ]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, model, dim, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+    
+    def clear(self, model: Optional[str] = None):
+        """Drop cached vectors (for one model, or all of them)"""
+        with self._lock:
+            if model is None:
+                self.conn.execute("DELETE FROM embeddings")
+            else:
+                self.conn.execute("DELETE FROM embeddings WHERE model = ?", (model,))
+            self.conn.commit()
+    
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self.conn.close()
+
+
+class BatchScheduler:
+    """Coalesce concurrent embedding requests into shared backend calls
+    
+    Callers post a list of texts and block on a Future. A single worker thread
+    drains the queue; a lone request is sent right away, while concurrent ones
+    wait up to `window_ms` for more (or until `max_batch` texts are pending)
+    and go out in one call, each caller getting its slice of the result.
+    
+    The backend reports whether it embedded the texts as given. If a shared
+    call had to degrade its inputs, each request is served on its own so only
+    the callers that need the fallback get approximate vectors.
+    """
+    
+    def __init__(self, embed_fn: Callable[[List[str]], Tuple[np.ndarray, bool]],
+                 window_ms: float = 10.0, max_batch: int = 64):
+        """
+        Args:
+            embed_fn: Function embedding a list of texts into an (n, d) array,
+                returned with a flag that is False if the inputs were altered
+            window_ms: How long to wait for more requests after the first one
+            max_batch: Maximum number of texts per backend call
+        """
+        self._embed_fn = embed_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+        self._worker.start()
+    
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for embedding; the Future resolves to (array, exact)"""
+        if self._closed:
+            raise RuntimeError("BatchScheduler is closed")
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future
+    
+    def embed(self, texts: List[str]) -> Tuple[np.ndarray, bool]:
+        """Blocking helper: submit and wait for the result"""
+        return self.submit(texts).result()
+    
+    def close(self):
+        """Stop the worker once queued requests are served"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
+    
+    def _collect(self) -> tuple:
+        """Block for one request, then gather more until the window closes
+        
+        Returns:
+            (pending requests, stop) where stop means close() was called
+        """
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        pending = [item]
+        total = len(item[0])
+        
+        # Nobody else is waiting: don't hold a lone caller for the window
+        if self._queue.empty():
+            return pending, False
+        
+        deadline = time.monotonic() + self.window
+        while total < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return pending, True
+            pending.append(item)
+            total += len(item[0])
+        
+        return pending, False
+    
+    def _run(self):
+        stop = False
+        while not stop:
+            pending, stop = self._collect()
+            if not pending:
+                continue
+            texts = [t for request_texts, _ in pending for t in request_texts]
+            
+            try:
+                embeddings, exact = self._embed_fn(texts)
+            except Exception as e:
+                if len(pending) == 1:
+                    pending[0][1].set_exception(e)
+                    continue
+                exact = False
+            
+            if not exact and len(pending) > 1:
+                # Don't let one bad input fail or degrade unrelated callers
+                for request_texts, future in pending:
+                    try:
+                        future.set_result(self._embed_fn(request_texts))
+                    except Exception as inner:
+                        future.set_exception(inner)
+                continue
+            
+            offset = 0
+            for request_texts, future in pending:
+                n = len(request_texts)
+                future.set_result((embeddings[offset:offset + n], exact))
+                offset += n
+
 
 class EmbeddingManager:
     """Unified manager for text and visual embeddings"""
@@ -28,14 +270,26 @@ class EmbeddingManager:
     VISUAL_MODEL = "openai/clip-vit-base-patch32"
     TEXT_DIM = 1024                # BGE-m3 output dimension
     VISUAL_DIM = 512
+    CLIP_IMAGE_SIZE = 224
+    CLIP_TEXT_CACHE_SIZE = 1024    # LRU entries for CLIP text queries
+    IMAGE_BATCH_SIZE = 64          # Images per CLIP forward pass (halved on CUDA OOM)
+    CLIP_MAX_TOKENS = 77           # CLIP text context length
     OLLAMA_TIMEOUT_SECONDS = 120.0
     
-    def __init__(self, device: Optional[str] = None):
+    # Persistent text embedding cache
+    EMBED_CACHE_PATH = Path(__file__).parent.parent / "Data_Layer" / "Data_Storage" / "embedding_cache.db"
+    
+    def __init__(self, device: Optional[str] = None, cache_path: Optional[str] = None,
+                 use_cache: bool = True, compile_clip: bool = False):
         """
         Initialize embedding models
         
         Args:
             device: 'cuda', 'cpu', or None (auto-detect)
+            cache_path: SQLite file for the text embedding cache (defaults to EMBED_CACHE_PATH)
+            use_cache: Disable to always call Ollama
+            compile_clip: Compile the CLIP feature extractors with torch.compile
+                (slow first call, faster steady state; needs a working inductor backend)
         """
         if device is None:
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -56,14 +310,128 @@ class EmbeddingManager:
         except Exception:
             print(f"⚠️  Model '{self.TEXT_MODEL}' not found locally – pulling from Ollama…")
             _ollama_lib.pull(self.TEXT_MODEL)
-        self._ollama = _ollama_lib.Client(timeout=self.OLLAMA_TIMEOUT_SECONDS)
+        self._ollama = _get_ollama_client(self.OLLAMA_TIMEOUT_SECONDS)
+        self._batcher = BatchScheduler(self._embed_via_ollama)
         print(f"✅ Text model ready (Ollama): {self.TEXT_MODEL} ({self.TEXT_DIM}d)")
         
-        # ---------- Visual embeddings (unchanged) ----------
-        self.clip_model = CLIPModel.from_pretrained(self.VISUAL_MODEL).to(self.device)
-        self.clip_processor = CLIPProcessor.from_pretrained(self.VISUAL_MODEL)
+        self._embed_cache = None
+        if use_cache:
+            try:
+                self._embed_cache = DiskEmbeddingCache(cache_path or self.EMBED_CACHE_PATH)
+            except sqlite3.Error as e:
+                print(f"⚠️  Embedding cache disabled: {e}")
+        
+        # ---------- Visual embeddings (shared across instances) ----------
+        # Half precision on GPU (bf16 where supported); CPU stays in fp32
+        self._device_type = torch.device(self.device).type
+        self._use_amp = self._device_type == "cuda"
+        if self._use_amp:
+            self._clip_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        else:
+            self._clip_dtype = torch.float32
+        
+        self.clip_model, self.clip_processor, self._clip_tok = self._load_clip(compile_clip)
+        self._init_image_transforms()
+        self._clip_text_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._clip_text_lock = threading.Lock()
+        self._image_batch_size = self.IMAGE_BATCH_SIZE
         print(f"✅ Visual model loaded: {self.VISUAL_MODEL} ({self.VISUAL_DIM}d)")
     
+    def _load_clip(self, compile_clip: bool):
+        """Load CLIP once per (model, device, dtype, compiled) and reuse it"""
+        key = (self.VISUAL_MODEL, self.device, self._clip_dtype, compile_clip)
+        with _CLIP_CACHE_LOCK:
+            if key not in _CLIP_CACHE:
+                model = CLIPModel.from_pretrained(self.VISUAL_MODEL).to(self.device)
+                if self._use_amp:
+                    model = model.to(dtype=self._clip_dtype)
+                model.eval()
+                if compile_clip:
+                    self._compile_clip(model)
+                
+                processor = CLIPProcessor.from_pretrained(self.VISUAL_MODEL)
+                try:
+                    # Rust BPE tokenizer; skips the CLIPProcessor wrapper on the text path
+                    tokenizer = CLIPTokenizerFast.from_pretrained(self.VISUAL_MODEL)
+                except Exception as e:
+                    print(f"⚠️  Fast CLIP tokenizer unavailable, using CLIPProcessor: {e}")
+                    tokenizer = None
+                
+                _CLIP_CACHE[key] = (model, processor, tokenizer)
+            else:
+                print("♻️  Reusing loaded CLIP model")
+            return _CLIP_CACHE[key]
+    
+    def _init_image_transforms(self):
+        """Build on-device CLIP preprocessing (falls back to CLIPProcessor)"""
+        image_processor = getattr(self.clip_processor, 'image_processor', None)
+        mean = getattr(image_processor, 'image_mean', None) or [0.48145466, 0.4578275, 0.40821073]
+        std = getattr(image_processor, 'image_std', None) or [0.26862954, 0.26130258, 0.27577711]
+        
+        # Precomputed for the already-224x224 fast path
+        self._clip_mean = torch.tensor(mean, dtype=torch.float32, device=self.device).view(1, 3, 1, 1)
+        self._clip_std = torch.tensor(std, dtype=torch.float32, device=self.device).view(1, 3, 1, 1)
+        
+        self._img_resize = None
+        self._img_normalize = None
+        if _tv2 is None:
+            return
+        
+        # Per-image: images have different sizes until resized + cropped
+        self._img_resize = _tv2.Compose([
+            _tv2.Resize(self.CLIP_IMAGE_SIZE, interpolation=_tv2.InterpolationMode.BICUBIC, antialias=True),
+            _tv2.CenterCrop(self.CLIP_IMAGE_SIZE),
+        ])
+        # Per-batch: uint8 -> float in [0, 1] -> CLIP normalization
+        self._img_normalize = _tv2.Compose([
+            _tv2.ToDtype(torch.float32, scale=True),
+            _tv2.Normalize(mean=mean, std=std),
+        ])
+    
+    def _compile_clip(self, model):
+        """Fuse CLIP kernels with torch.compile (keeps eager mode on failure)"""
+        if not hasattr(torch, 'compile'):
+            print("⚠️  torch.compile unavailable (requires torch>=2.0)")
+            return
+        
+        # CUDA graphs cut launch overhead on GPU; plain inductor on CPU
+        mode = "reduce-overhead" if self._device_type == "cuda" else "default"
+        try:
+            model.get_image_features = torch.compile(
+                model.get_image_features, mode=mode, dynamic=True
+            )
+            model.get_text_features = torch.compile(
+                model.get_text_features, mode=mode, dynamic=True
+            )
+            print(f"✅ CLIP compiled (torch.compile, mode={mode})")
+        except Exception as e:
+            print(f"⚠️  CLIP compilation skipped: {e}")
+    
+    def _autocast(self):
+        """Autocast context for CLIP forward passes (no-op on CPU)"""
+        if not self._use_amp:
+            return contextlib.nullcontext()
+        return torch.autocast(self._device_type, dtype=self._clip_dtype)
+    
+    def _is_clip_sized(self, pil_images: List[Image.Image]) -> bool:
+        """True if every image is already a CLIP-sized RGB thumbnail"""
+        size = (self.CLIP_IMAGE_SIZE, self.CLIP_IMAGE_SIZE)
+        return all(img.size == size and img.mode == 'RGB' for img in pil_images)
+    
+    def _normalize_clip_sized(self, pil_images: List[Image.Image]) -> torch.Tensor:
+        """Skip resizing: stack, move to the device and normalize"""
+        pixels = torch.from_numpy(np.stack([np.asarray(img) for img in pil_images])).permute(0, 3, 1, 2)
+        pixels = pixels.to(self.device, non_blocking=True).float().div_(255.0)
+        return (pixels - self._clip_mean) / self._clip_std
+    
+    def _preprocess_images(self, pil_images: List[Image.Image]) -> torch.Tensor:
+        """Move uint8 RGB images to the device and resize/normalize them there"""
+        tensors = []
+        for img in pil_images:
+            pixels = torch.from_numpy(np.array(img, dtype=np.uint8)).permute(2, 0, 1)
+            tensors.append(self._img_resize(pixels.to(self.device, non_blocking=True)))
+        return self._img_normalize(torch.stack(tensors))
+    
     def encode_text(self, texts: Union[str, List[str]], normalize: bool = True) -> np.ndarray:
         """
         Encode text(s) into embeddings via Ollama BGE-m3
@@ -78,6 +446,53 @@ class EmbeddingManager:
         if isinstance(texts, str):
             texts = [texts]
         
+        # Embed each distinct text once, then scatter back to input positions
+        seen: Dict[str, int] = {}
+        ids = [seen.setdefault(t, len(seen)) for t in texts]
+        if len(seen) < len(texts):
+            unique = self.encode_text(list(seen), normalize=normalize)
+            return unique[ids]
+        
+        if self._embed_cache is None:
+            embeddings, _ = self._batcher.embed(texts)
+        else:
+            keys = [self._text_cache_key(t) for t in texts]
+            cached = self._embed_cache.get_many(keys, self.TEXT_MODEL)
+            
+            # Only texts we have never seen go to Ollama
+            uncached = [i for i, key in enumerate(keys) if key not in cached]
+            if uncached:
+                fresh, exact = self._batcher.embed([texts[i] for i in uncached])
+                new_items = {keys[i]: fresh[j] for j, i in enumerate(uncached)}
+                # Truncated-input fallbacks are served but never stored under the full text
+                if exact:
+                    self._embed_cache.put_many(new_items, self.TEXT_MODEL)
+                cached.update(new_items)
+            
+            embeddings = np.stack([cached[key] for key in keys])
+        
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        
+        if normalize:
+            _l2_normalize_inplace(embeddings)
+        
+        return embeddings
+    
+    def _text_cache_key(self, text: str) -> bytes:
+        """SHA-256 of model + text, used as the disk cache key"""
+        return hashlib.sha256(f"{self.TEXT_MODEL}|{text}".encode('utf-8', errors='ignore')).digest()
+    
+    def _clip_text_cache_key(self, text: str) -> bytes:
+        """SHA-256 of CLIP model + normalized query, used as the disk cache key"""
+        return hashlib.sha256(f"{self.VISUAL_MODEL}|{text}".encode('utf-8', errors='ignore')).digest()
+    
+    def _embed_via_ollama(self, texts: List[str]) -> Tuple[np.ndarray, bool]:
+        """Call the Ollama embed API for a list of texts (unnormalized)
+        
+        Returns:
+            (embeddings, exact) where exact is False if the texts had to be
+            truncated for the retry
+        """
         # Ollama embed API accepts a list of inputs
         try:
             response = self._ollama.embed(model=self.TEXT_MODEL, input=texts)
@@ -88,13 +503,8 @@ class EmbeddingManager:
             # Retry once with more conservative payload sizes
             reduced = [str(t)[:600] for t in texts]
             response = self._ollama.embed(model=self.TEXT_MODEL, input=reduced)
-        embeddings = np.array(response["embeddings"], dtype=np.float32)
-        
-        if normalize:
-            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-            embeddings = embeddings / (norms + 1e-8)
-        
-        return embeddings
+            return np.array(response["embeddings"], dtype=np.float32), False
+        return np.array(response["embeddings"], dtype=np.float32), True
     
     def encode_image(self, images: Union[str, Path, Image.Image, List], normalize: bool = True) -> np.ndarray:
         """
@@ -111,21 +521,82 @@ class EmbeddingManager:
         if not isinstance(images, list):
             images = [images]
         
-        # Load images
+        if len(images) <= self._image_batch_size:
+            return self._encode_images_adaptive(self._load_images(images), normalize)
+        
+        # Long lists: decode batch N+1 on a worker thread while batch N is encoded
+        batch_size = self._image_batch_size
+        batches = [images[i:i + batch_size] for i in range(0, len(images), batch_size)]
+        outputs = []
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="clip-image-loader") as loader:
+            pending = loader.submit(self._load_images, batches[0])
+            for i in range(len(batches)):
+                pil_images = pending.result()
+                if i + 1 < len(batches):
+                    pending = loader.submit(self._load_images, batches[i + 1])
+                outputs.append(self._encode_images_adaptive(pil_images, normalize))
+        
+        return np.concatenate(outputs)
+    
+    @classmethod
+    def _load_images(cls, images: List) -> List[Image.Image]:
+        """Open/convert paths and PIL images to RGB, shrunk close to CLIP size"""
+        size = cls.CLIP_IMAGE_SIZE
         pil_images = []
         for img in images:
             if isinstance(img, (str, Path)):
-                pil_images.append(Image.open(img).convert('RGB'))
-            elif isinstance(img, Image.Image):
-                pil_images.append(img.convert('RGB'))
-            else:
+                img = Image.open(img)
+                # JPEG: decode at 1/2, 1/4 or 1/8 scale in libjpeg (stays >= size x size)
+                img.draft('RGB', (size, size))
+            elif not isinstance(img, Image.Image):
                 raise ValueError(f"Unsupported image type: {type(img)}")
+            pil_images.append(cls._reduce_for_clip(img.convert('RGB'), size))
+        return pil_images
+    
+    @staticmethod
+    def _reduce_for_clip(img: Image.Image, size: int) -> Image.Image:
+        """
+        Box-downscale by an integer factor while the short side stays >= 2 * size
         
+        Keeps full-resolution pixels off the device; the exact bicubic
+        resize + crop to size x size still happens in preprocessing.
+        """
+        factor = min(img.size) // (2 * size)
+        return img.reduce(factor) if factor >= 2 else img
+    
+    def _encode_images_adaptive(self, pil_images: List[Image.Image], normalize: bool) -> np.ndarray:
+        """Encode in mini-batches, halving the batch size on CUDA OOM (remembered)"""
+        outputs = []
+        start = 0
+        while start < len(pil_images):
+            batch_size = self._image_batch_size
+            batch = pil_images[start:start + batch_size]
+            try:
+                outputs.append(self._encode_image_batch(batch, normalize))
+            except torch.cuda.OutOfMemoryError:
+                if batch_size == 1:
+                    raise
+                self._image_batch_size = max(1, batch_size // 2)
+                torch.cuda.empty_cache()
+                print(f"⚠️  CUDA OOM at image batch {batch_size}, retrying with {self._image_batch_size}")
+                continue
+            start += len(batch)
+        
+        return outputs[0] if len(outputs) == 1 else np.concatenate(outputs)
+    
+    def _encode_image_batch(self, pil_images: List[Image.Image], normalize: bool) -> np.ndarray:
+        """One CLIP image forward pass"""
         # Process and encode
-        inputs = self.clip_processor(images=pil_images, return_tensors="pt", padding=True)
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        if self._is_clip_sized(pil_images):
+            inputs = {'pixel_values': self._normalize_clip_sized(pil_images)}
+        elif self._img_resize is not None:
+            inputs = {'pixel_values': self._preprocess_images(pil_images)}
+        else:
+            inputs = self.clip_processor(images=pil_images, return_tensors="pt", padding=True)
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        inputs['pixel_values'] = inputs['pixel_values'].to(self._clip_dtype)
         
-        with torch.no_grad():
+        with torch.inference_mode(), self._autocast():
             image_features = self.clip_model.get_image_features(**inputs)
 
             # Compatibility: some environments may return model outputs instead of tensor
@@ -138,12 +609,11 @@ class EmbeddingManager:
                     raise TypeError(f"Unexpected CLIP image feature output type: {type(image_features)}")
         
         # Convert to numpy
-        embeddings = image_features.detach().cpu().numpy()
+        embeddings = np.ascontiguousarray(image_features.detach().float().cpu().numpy(), dtype=np.float32)
         
         # Normalize if requested
         if normalize:
-            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-            embeddings = embeddings / (norms + 1e-8)
+            _l2_normalize_inplace(embeddings)
         
         return embeddings
     
@@ -161,11 +631,61 @@ class EmbeddingManager:
         if isinstance(texts, str):
             texts = [texts]
         
-        # Process and encode
-        inputs = self.clip_processor(text=texts, return_tensors="pt", padding=True)
+        # CLIP's tokenizer lowercases and collapses whitespace, so keys can too
+        keys = [" ".join(t.split()).lower() for t in texts]
+        
+        # Serve repeated queries from the LRU, then the disk cache, run CLIP only on the rest
+        found = {}
+        with self._clip_text_lock:
+            for key in keys:
+                vector = self._clip_text_cache.get(key)
+                if vector is not None:
+                    self._clip_text_cache.move_to_end(key)
+                    found[key] = vector
+        
+        uncached = list(dict.fromkeys(k for k in keys if k not in found))
+        if uncached and self._embed_cache is not None:
+            disk_keys = {k: self._clip_text_cache_key(k) for k in uncached}
+            on_disk = self._embed_cache.get_many(list(disk_keys.values()), self.VISUAL_MODEL)
+            for key, disk_key in disk_keys.items():
+                if disk_key in on_disk:
+                    found[key] = on_disk[disk_key].astype(np.float16)
+            uncached = [k for k in uncached if k not in found]
+        
+        if uncached:
+            features = self._clip_text_features(uncached)
+            new_items = {}
+            for key, vector in zip(uncached, features):
+                found[key] = vector.astype(np.float16)
+                new_items[self._clip_text_cache_key(key)] = found[key]
+            if self._embed_cache is not None:
+                self._embed_cache.put_many(new_items, self.VISUAL_MODEL)
+        
+        with self._clip_text_lock:
+            for key in dict.fromkeys(keys):
+                self._clip_text_cache[key] = found[key]
+                self._clip_text_cache.move_to_end(key)
+            while len(self._clip_text_cache) > self.CLIP_TEXT_CACHE_SIZE:
+                self._clip_text_cache.popitem(last=False)
+        
+        embeddings = np.stack([found[k] for k in keys]).astype(np.float32)
+        
+        # Normalize if requested
+        if normalize:
+            _l2_normalize_inplace(embeddings)
+        
+        return embeddings
+    
+    def _clip_text_features(self, texts: List[str]) -> np.ndarray:
+        """Run the CLIP text tower (unnormalized float32 features)"""
+        if self._clip_tok is not None:
+            inputs = self._clip_tok(texts, padding=True, truncation=True,
+                                    max_length=self.CLIP_MAX_TOKENS, return_tensors="pt")
+        else:
+            inputs = self.clip_processor(text=texts, return_tensors="pt", padding=True)
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
         
-        with torch.no_grad():
+        with torch.inference_mode(), self._autocast():
             text_features = self.clip_model.get_text_features(**inputs)
 
             # Compatibility: some environments may return model outputs instead of tensor
@@ -177,15 +697,14 @@ class EmbeddingManager:
                 else:
                     raise TypeError(f"Unexpected CLIP text feature output type: {type(text_features)}")
         
-        # Convert to numpy
-        embeddings = text_features.detach().cpu().numpy()
-        
-        # Normalize if requested
-        if normalize:
-            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-            embeddings = embeddings / (norms + 1e-8)
-        
-        return embeddings
+        return np.ascontiguousarray(text_features.detach().float().cpu().numpy(), dtype=np.float32)
+    
+    def close(self):
+        """Stop the embedding batch worker and close the disk cache"""
+        self._batcher.close()
+        if self._embed_cache is not None:
+            self._embed_cache.close()
+            self._embed_cache = None
 
 
 def test_embeddings():
@@ -8,42 +8,148 @@ Handles:
 - Screenshot analysis
 """
 
-from typing import Tuple, Optional, Dict
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from operator import itemgetter
+from typing import Tuple, Optional, Dict, List, Union
 from pathlib import Path
+import os
+import re
+import threading
+import PIL
 from PIL import Image
 import numpy as np
 
+# Screenshot hints: 'screenshot' anywhere in the path, the rest only in the
+# filename (the part after the NUL separator used by is_screenshot)
+_SCREENSHOT_RE = re.compile(r'screenshot|(?:screen shot|capture|scr_)(?!.*\x00)', re.DOTALL)
+
+# EasyOCR detections are (bbox, text, confidence)
+_TEXT_OF = itemgetter(1)
+
+# Pillow-SIMD (AVX2 resampling) reports versions like "9.0.0.post1"
+_PILLOW_SIMD = '.post' in PIL.__version__
+
+try:
+    import cv2 as _cv2  # ships with easyocr (opencv-python-headless)
+except ImportError:
+    _cv2 = None
+
+
+# requested engine name -> (resolved engine name, OCR object or None)
+_OCR_ENGINES: Dict[str, Tuple[str, object]] = {}
+_OCR_LOCK = threading.Lock()
+# PyTessBaseAPI is not thread-safe; serializes the shared tesserocr engine
+_TESSEROCR_LOCK = threading.Lock()
+
+
+def _load_ocr_engine(ocr_engine: str) -> Tuple[str, object]:
+    """
+    Load an OCR engine (called once per engine name)
+    
+    Args:
+        ocr_engine: 'tesserocr', 'pytesseract', 'easyocr', or 'none'
+        
+    Returns:
+        (engine actually in use, OCR object or None)
+    """
+    if ocr_engine == "tesserocr":
+        try:
+            import tesserocr
+            # In-process libtesseract: engine + trained data stay loaded across calls
+            ocr = tesserocr.PyTessBaseAPI(lang='eng+fra', psm=tesserocr.PSM.AUTO)
+            print("✅ OCR: tesserocr loaded (eng+fra)")
+            return ocr_engine, ocr
+        except Exception as e:
+            print(f"⚠️  tesserocr unavailable ({e}). Falling back to pytesseract.")
+            print("   Install: uv add tesserocr")
+            ocr_engine = "pytesseract"
+    
+    if ocr_engine == "pytesseract":
+        try:
+            import pytesseract
+            print("✅ OCR: pytesseract loaded")
+            return ocr_engine, pytesseract
+        except ImportError:
+            print("⚠️  pytesseract not installed. OCR disabled.")
+            print("   Install: uv add pytesseract")
+    
+    elif ocr_engine == "easyocr":
+        try:
+            import easyocr
+            ocr = easyocr.Reader(['en', 'fr'], gpu=True, cudnn_benchmark=True)
+            print("✅ OCR: EasyOCR loaded (en, fr)")
+            return ocr_engine, ocr
+        except ImportError:
+            print("⚠️  easyocr not installed. OCR disabled.")
+            print("   Install: uv add easyocr")
+    
+    return ocr_engine, None
+
+
+def release_ocr_engines():
+    """Shut down shared OCR engines (frees tesserocr's native engine)"""
+    with _OCR_LOCK:
+        for engine, ocr in _OCR_ENGINES.values():
+            if engine == "tesserocr" and ocr is not None:
+                with _TESSEROCR_LOCK:
+                    ocr.End()
+        _OCR_ENGINES.clear()
+
+
+# Per-process ImageProcessor used by process_batch workers
+_WORKER_PROCESSOR = None
+
+
+def _init_worker_processor(ocr_engine: str):
+    """Process-pool initializer: load the OCR engine once per worker"""
+    global _WORKER_PROCESSOR
+    _WORKER_PROCESSOR = ImageProcessor(ocr_engine=ocr_engine)
+
+
+def _process_in_worker(image_path: str) -> Dict:
+    """Process one image with the worker's ImageProcessor (top-level so it pickles)"""
+    return _WORKER_PROCESSOR._process_one(image_path)
+
 
 class ImageProcessor:
     """Process images for OCR and embeddings"""
     
+    # Common canvas for batched EasyOCR (images are resized to it)
+    OCR_BATCH_WIDTH = 800
+    OCR_BATCH_HEIGHT = 600
+    OCR_BATCH_SIZE = 8
+    
+    # Per-file caches, invalidated when (mtime_ns, size) changes
+    METADATA_CACHE_SIZE = 256
+    PIXEL_CACHE_BYTES = 256 * 1024 * 1024
+    
     def __init__(self, ocr_engine: str = "none"):
         """
         Initialize image processor
         
         Args:
-            ocr_engine: 'pytesseract', 'easyocr', or 'none'
+            ocr_engine: 'tesserocr', 'pytesseract', 'easyocr', or 'none'
         """
         self.ocr_engine = ocr_engine
         self.ocr = None
         
-        if ocr_engine == "pytesseract":
-            try:
-                import pytesseract
-                self.ocr = pytesseract
-                print("✅ OCR: pytesseract loaded")
-            except ImportError:
-                print("⚠️  pytesseract not installed. OCR disabled.")
-                print("   Install: uv add pytesseract")
-        
-        elif ocr_engine == "easyocr":
-            try:
-                import easyocr
-                self.ocr = easyocr.Reader(['en', 'fr'])
-                print("✅ OCR: EasyOCR loaded (en, fr)")
-            except ImportError:
-                print("⚠️  easyocr not installed. OCR disabled.")
-                print("   Install: uv add easyocr")
+        # path -> ((mtime_ns, size), value), least recently used first
+        self._metadata_cache: "OrderedDict[str, Tuple[Tuple[int, int], Dict]]" = OrderedDict()
+        self._pixel_cache: "OrderedDict[Tuple, Tuple[Tuple[int, int], np.ndarray]]" = OrderedDict()
+        self._pixel_cache_bytes = 0
+        # Guards both caches (process_batch calls in from a thread pool)
+        self._cache_lock = threading.Lock()
+        
+        # OCR engines are process-wide singletons: rebuilding a processor
+        # (per worker/thread/file) never reloads models
+        with _OCR_LOCK:
+            fresh = ocr_engine not in _OCR_ENGINES
+            if fresh:
+                _OCR_ENGINES[ocr_engine] = _load_ocr_engine(ocr_engine)
+            self.ocr_engine, self.ocr = _OCR_ENGINES[ocr_engine]
+            if fresh and self.ocr_engine == "easyocr" and self.ocr is not None:
+                self._warmup_easyocr()
     
     def extract_text(self, image_path: str) -> str:
         """
@@ -59,14 +165,20 @@ class ImageProcessor:
             return ""
         
         try:
+            if self.ocr_engine == "easyocr":
+                # EasyOCR consumes the BGR array directly; no PIL decode + copy
+                result = self.ocr.readtext(self._load_as_bgr(image_path))
+                return " ".join(map(_TEXT_OF, result)).strip()
+            
             image = Image.open(image_path)
             
-            if self.ocr_engine == "pytesseract":
-                text = self.ocr.image_to_string(image, lang='eng+fra')
+            if self.ocr_engine == "tesserocr":
+                with _TESSEROCR_LOCK:
+                    self.ocr.SetImage(image)
+                    text = self.ocr.GetUTF8Text()
             
-            elif self.ocr_engine == "easyocr":
-                result = self.ocr.readtext(np.array(image))
-                text = " ".join([detection[1] for detection in result])
+            elif self.ocr_engine == "pytesseract":
+                text = self.ocr.image_to_string(image, lang='eng+fra')
             
             else:
                 return ""
@@ -77,6 +189,134 @@ class ImageProcessor:
             print(f"❌ OCR error for {image_path}: {e}")
             return ""
     
+    @staticmethod
+    def _load_as_bgr(image_path: str) -> np.ndarray:
+        """Decode an image file straight into a contiguous BGR uint8 array"""
+        if _cv2 is not None:
+            buf = np.frombuffer(Path(image_path).read_bytes(), np.uint8)
+            image = _cv2.imdecode(buf, _cv2.IMREAD_COLOR)
+            if image is not None:
+                return image
+        # Formats OpenCV can't decode (or no cv2): go through PIL
+        rgb = np.asarray(Image.open(image_path).convert('RGB'))
+        return np.ascontiguousarray(rgb[:, :, ::-1])
+    
+    def _ocr_batch_size(self) -> int:
+        """Batch size for readtext_batched (MPS produces garbage with batch > 1)"""
+        device = str(getattr(self.ocr, 'device', 'cpu'))
+        return 1 if device.startswith('mps') else self.OCR_BATCH_SIZE
+    
+    def _warmup_easyocr(self):
+        """Run one dummy batch so cuDNN autotuning doesn't stall the first real batch"""
+        if not str(getattr(self.ocr, 'device', 'cpu')).startswith('cuda'):
+            return
+        try:
+            batch_size = self._ocr_batch_size()
+            dummy = np.zeros([batch_size, self.OCR_BATCH_HEIGHT, self.OCR_BATCH_WIDTH, 3], dtype=np.uint8)
+            self.ocr.readtext_batched(dummy, batch_size=batch_size)
+        except Exception as e:
+            print(f"⚠️  EasyOCR warmup skipped: {e}")
+    
+    def extract_text_batch(self, image_paths: List[str]) -> List[str]:
+        """
+        Extract text from many images at once
+        
+        With EasyOCR, images are resized to a common canvas and run through
+        the detector as stacked batches; other engines fall back to extract_text.
+        
+        Args:
+            image_paths: Paths to image files
+            
+        Returns:
+            Extracted text per image (empty string on failure)
+        """
+        if self.ocr_engine != "easyocr" or self.ocr is None:
+            return [self.extract_text(path) for path in image_paths]
+        
+        texts = [""] * len(image_paths)
+        images = []
+        positions = []
+        for i, image_path in enumerate(image_paths):
+            try:
+                images.append(self._load_as_bgr(image_path))
+                positions.append(i)
+            except Exception as e:
+                print(f"❌ OCR error for {image_path}: {e}")
+        
+        if not images:
+            return texts
+        
+        try:
+            results = self.ocr.readtext_batched(
+                images,
+                n_width=self.OCR_BATCH_WIDTH,
+                n_height=self.OCR_BATCH_HEIGHT,
+                batch_size=self._ocr_batch_size()
+            )
+        except Exception as e:
+            print(f"⚠️  Batched OCR failed, processing one by one: {e}")
+            return [self.extract_text(path) for path in image_paths]
+        
+        for i, result in zip(positions, results):
+            texts[i] = " ".join(map(_TEXT_OF, result)).strip()
+        
+        return texts
+    
+    def process_batch(self, image_paths: List[str], workers: Optional[int] = None) -> List[Dict]:
+        """
+        OCR + metadata + screenshot detection for many images in parallel
+        
+        Tesseract engines run in a process pool (one engine per worker);
+        EasyOCR runs in a thread pool sharing this instance's Reader.
+        
+        Args:
+            image_paths: Paths to image files
+            workers: Number of workers (defaults to os.cpu_count())
+            
+        Returns:
+            One dict per image with 'path', 'text', 'metadata', 'is_screenshot'
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(image_paths) <= 1:
+            return [self._process_one(path) for path in image_paths]
+        
+        if self.ocr_engine == "easyocr":
+            # Torch releases the GIL around CUDA calls, so threads overlap
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(self._process_one, image_paths))
+        
+        # CPU-bound decode + Tesseract: separate processes sidestep the GIL
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker_processor,
+                                     initargs=(self.ocr_engine,)) as pool:
+                return list(pool.map(_process_in_worker, image_paths, chunksize=4))
+        except Exception as e:
+            print(f"⚠️  Process pool failed, processing serially: {e}")
+            return [self._process_one(path) for path in image_paths]
+    
+    def _process_one(self, image_path: str) -> Dict:
+        """Full per-image processing used by process_batch"""
+        return {
+            'path': image_path,
+            'text': self.extract_text(image_path),
+            'metadata': self.get_image_metadata(image_path),
+            'is_screenshot': self.is_screenshot(image_path),
+        }
+    
+    def close(self):
+        """Drop this processor's handle on the shared OCR engine
+        
+        The engine itself stays loaded for other processors; use
+        release_ocr_engines() at shutdown to free it.
+        """
+        self.ocr = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
     def get_image_metadata(self, image_path: str) -> Dict:
         """
         Extract image metadata
@@ -88,63 +328,122 @@ class ImageProcessor:
             Dictionary with metadata
         """
         try:
-            image = Image.open(image_path)
+            key = os.fspath(image_path)
+            st = os.stat(key)
+            signature = (st.st_mtime_ns, st.st_size)
+            
+            with self._cache_lock:
+                cached = self._metadata_cache.get(key)
+                if cached is not None and cached[0] == signature:
+                    self._metadata_cache.move_to_end(key)
+                    return dict(cached[1])
+            
+            # Header-only read: Image.open doesn't decode pixels
+            with Image.open(key) as image:
+                metadata = {
+                    'width': image.width,
+                    'height': image.height,
+                    'format': image.format,
+                    'mode': image.mode,
+                    'size_bytes': st.st_size
+                }
+            
+            with self._cache_lock:
+                self._metadata_cache[key] = (signature, metadata)
+                self._metadata_cache.move_to_end(key)
+                if len(self._metadata_cache) > self.METADATA_CACHE_SIZE:
+                    self._metadata_cache.popitem(last=False)
             
-            return {
-                'width': image.width,
-                'height': image.height,
-                'format': image.format,
-                'mode': image.mode,
-                'size_bytes': Path(image_path).stat().st_size
-            }
+            return dict(metadata)
         
         except Exception as e:
             print(f"❌ Metadata error for {image_path}: {e}")
             return {}
     
-    def preprocess_image(self, image_path: str, max_size: Tuple[int, int] = (1024, 1024)) -> Image.Image:
+    def preprocess_image(self, image_path: str, max_size: Tuple[int, int] = (1024, 1024),
+                         as_array: bool = False) -> Union[Image.Image, np.ndarray]:
         """
         Preprocess image for embedding
         
         Args:
             image_path: Path to image file
             max_size: Maximum dimensions (width, height)
+            as_array: Return an RGB uint8 numpy array instead of a PIL Image
             
         Returns:
-            Preprocessed PIL Image
+            Preprocessed PIL Image (or numpy array if as_array)
         """
         image = Image.open(image_path).convert('RGB')
         
         # Resize if too large
         if image.width > max_size[0] or image.height > max_size[1]:
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+            if _PILLOW_SIMD or _cv2 is None:
+                image.thumbnail(max_size, Image.Resampling.LANCZOS)
+            else:
+                # OpenCV's SIMD area resize; same aspect-preserving fit as thumbnail()
+                scale = min(max_size[0] / image.width, max_size[1] / image.height)
+                dsize = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+                resized = _cv2.resize(np.asarray(image), dsize, interpolation=_cv2.INTER_AREA)
+                return resized if as_array else Image.fromarray(resized)
         
-        return image
+        return np.asarray(image) if as_array else image
     
-    def is_screenshot(self, image_path: str) -> bool:
+    def preprocess_image_cached(self, image_path: str,
+                                max_size: Tuple[int, int] = (1024, 1024)) -> np.ndarray:
         """
-        Detect if image is likely a screenshot
+        Preprocess image and memoize the resized RGB array
         
         Args:
             image_path: Path to image file
+            max_size: Maximum dimensions (width, height)
             
         Returns:
-            True if likely a screenshot
+            Read-only RGB uint8 numpy array (shared between calls)
         """
-        path = Path(image_path)
+        path = os.fspath(image_path)
+        st = os.stat(path)
+        signature = (st.st_mtime_ns, st.st_size)
+        key = (path, tuple(max_size))
         
-        # Check filename patterns
-        screenshot_patterns = ['screenshot', 'screen shot', 'capture', 'scr_']
-        filename_lower = path.name.lower()
+        with self._cache_lock:
+            cached = self._pixel_cache.get(key)
+            if cached is not None and cached[0] == signature:
+                self._pixel_cache.move_to_end(key)
+                return cached[1]
         
-        if any(pattern in filename_lower for pattern in screenshot_patterns):
-            return True
+        # Decode outside the lock so other threads keep working
+        array = np.array(self.preprocess_image(path, max_size, as_array=True))
+        array.setflags(write=False)
         
-        # Check parent folder
-        if 'screenshot' in str(path.parent).lower():
-            return True
+        with self._cache_lock:
+            # Drop a stale (file changed) or concurrently added entry first
+            previous = self._pixel_cache.pop(key, None)
+            if previous is not None:
+                self._pixel_cache_bytes -= previous[1].nbytes
+            
+            # Don't let one huge image flush everything else
+            if array.nbytes <= self.PIXEL_CACHE_BYTES:
+                self._pixel_cache[key] = (signature, array)
+                self._pixel_cache_bytes += array.nbytes
+                while self._pixel_cache_bytes > self.PIXEL_CACHE_BYTES:
+                    _, (_, evicted) = self._pixel_cache.popitem(last=False)
+                    self._pixel_cache_bytes -= evicted.nbytes
         
-        return False
+        return array
+    
+    def is_screenshot(self, image_path: str) -> bool:
+        """
+        Detect if image is likely a screenshot
+        
+        Args:
+            image_path: Path to image file
+            
+        Returns:
+            True if likely a screenshot
+        """
+        # Plain string ops (no Path objects); one regex pass over folder + filename
+        parent, name = os.path.split(os.fspath(image_path))
+        return _SCREENSHOT_RE.search(f"{parent}\x00{name}".lower()) is not None
 
 
 def test_image_processor():
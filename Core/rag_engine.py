@@ -9,26 +9,220 @@ Handles:
 - Context formatting for LLM consumption
 """
 
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple, Callable, Iterator
+import hashlib
 import json
-import sys
-from pathlib import Path
+import threading
+import time
 
-# Add Data_Layer to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "Data_Layer"))
+import numpy as np
+
+# Lazily loaded tiktoken encoding (False = tiktoken unavailable)
+_ENC = None
+
+
+def _encoding():
+    """Get the cl100k_base tokenizer, or None if tiktoken isn't installed"""
+    global _ENC
+    if _ENC is None:
+        try:
+            import tiktoken
+            _ENC = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            print("⚠️  tiktoken not available, using ~4 chars/token estimate")
+            _ENC = False
+    return _ENC or None
+
+
+class QueryCache:
+    """LRU + TTL cache of retrieval results, with optional semantic lookup"""
+    
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 300,
+                 similarity_threshold: float = 0.95, semantic_size: int = 256):
+        """
+        Initialize query cache
+        
+        Args:
+            max_size: Maximum cached queries (least recently used are evicted)
+            ttl_seconds: Lifetime of a cached result
+            similarity_threshold: Cosine similarity for a semantic (near-match) hit
+            semantic_size: Number of recent query embeddings kept for semantic lookup
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.semantic_size = semantic_size
+        
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[Tuple, Tuple[float, int, List[Dict]]]" = OrderedDict()
+        
+        # Ring buffer of recent unit-norm query embeddings and their cache keys
+        self._sem_matrix: Optional[np.ndarray] = None
+        self._sem_keys: List[Optional[Tuple]] = [None] * semantic_size
+        self._sem_next = 0
+        
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(query: str, top_k: int, search_type: str, filters: Optional[Dict]) -> Tuple:
+        """Build a cache key from the stripped query and retrieval parameters"""
+        filter_key = tuple(sorted((k, repr(v)) for k, v in filters.items())) if filters else ()
+        return (query.strip(), top_k, search_type, filter_key)
+    
+    def get(self, key: Tuple, generation: int = 0,
+            embed_fn: Optional[Callable[[], Optional[np.ndarray]]] = None) -> Optional[List[Dict]]:
+        """
+        Look up cached results
+        
+        Args:
+            key: Key from make_key()
+            generation: Current storage generation (older entries are stale)
+            embed_fn: Returns the query embedding; only called after an exact miss
+            
+        Returns:
+            Cached results or None
+        """
+        with self._lock:
+            results = self._get_exact(key, generation)
+            if results is not None:
+                self.hits += 1
+                return results
+            semantic = embed_fn is not None and self._sem_matrix is not None
+        
+        # Embed outside the lock so concurrent lookups aren't serialized on it
+        embedding = embed_fn() if semantic else None
+        
+        with self._lock:
+            if embedding is not None and self._sem_matrix is not None:
+                query_vec = self._unit(embedding)
+                scores = self._sem_matrix @ query_vec
+                # Only rows above the threshold get ordered (usually none or one)
+                above = np.flatnonzero(scores >= self.similarity_threshold)
+                for row in above[np.argsort(-scores[above])]:
+                    cand = self._sem_keys[row]
+                    # Same retrieval parameters, only the query text may differ
+                    if cand is None or cand[1:] != key[1:]:
+                        continue
+                    results = self._get_exact(cand, generation)
+                    if results is not None:
+                        self.semantic_hits += 1
+                        return results
+            
+            self.misses += 1
+            return None
+    
+    def put(self, key: Tuple, results: List[Dict], generation: int = 0,
+            embedding: Optional[np.ndarray] = None):
+        """
+        Store results
+        
+        Args:
+            key: Key from make_key()
+            results: Retrieved results
+            generation: Storage generation the results were computed at
+            embedding: Query embedding to enable semantic lookup (optional)
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), generation, list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            
+            if embedding is not None:
+                query_vec = self._unit(embedding)
+                if self._sem_matrix is None:
+                    self._sem_matrix = np.zeros((self.semantic_size, query_vec.shape[0]), dtype=np.float32)
+                self._sem_matrix[self._sem_next] = query_vec
+                self._sem_keys[self._sem_next] = key
+                self._sem_next = (self._sem_next + 1) % self.semantic_size
+    
+    def peek(self, key: Tuple, generation: int = 0) -> Optional[List[Dict]]:
+        """Exact-key lookup that doesn't touch hit/miss statistics"""
+        with self._lock:
+            return self._get_exact(key, generation)
+    
+    def clear(self):
+        """Drop all cached results"""
+        with self._lock:
+            self._entries.clear()
+            self._sem_matrix = None
+            self._sem_keys = [None] * self.semantic_size
+            self._sem_next = 0
+    
+    def stats(self) -> Dict:
+        """Get cache statistics"""
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'semantic_hits': self.semantic_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+            }
+    
+    def _get_exact(self, key: Tuple, generation: int) -> Optional[List[Dict]]:
+        """Exact-key lookup; drops expired or stale entries"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        stored_at, stored_generation, results = entry
+        if stored_generation != generation or time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        
+        self._entries.move_to_end(key)
+        return list(results)
+    
+    @staticmethod
+    def _unit(embedding: np.ndarray) -> np.ndarray:
+        """Flatten to a unit-norm float32 vector"""
+        vec = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
 
 
 class RAGEngine:
     """RAG pipeline for context retrieval and augmented generation"""
     
-    def __init__(self, storage_manager=None):
+    DEFAULT_SYSTEM_PROMPT = (
+        "You are a helpful AI assistant with access to the user's personal knowledge base. "
+        "Use the provided context to answer the user's question accurately. "
+        "If the context doesn't contain relevant information, say so honestly."
+    )
+    CONTEXT_SEPARATOR = "\n---\n"
+    
+    # Query embedding cache (LRU + TTL)
+    EMBEDDING_CACHE_SIZE = 2048
+    EMBEDDING_CACHE_TTL_SECONDS = 3600
+    
+    # Threads used by retrieve_batch
+    RETRIEVE_WORKERS = 4
+    
+    def __init__(self, storage_manager=None, cache: Optional[QueryCache] = None,
+                 semantic_cache: bool = True, max_workers: int = RETRIEVE_WORKERS):
         """
         Initialize RAG engine
         
         Args:
             storage_manager: UnifiedStorageManager instance
+            cache: Query-result cache (a default QueryCache is created if None)
+            semantic_cache: Also match near-duplicate queries by embedding similarity
+            max_workers: Threads retrieve_batch uses for uncached queries
         """
         self.storage = storage_manager
+        self.cache = cache if cache is not None else QueryCache()
+        self.semantic_cache = semantic_cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rag-retrieve")
+        
+        # sha256(stripped query) -> (stored_at, embedding)
+        self._emb_cache: "OrderedDict[bytes, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._emb_lock = threading.Lock()
     
     def retrieve(self, query: str, top_k: int = 5, filters: Dict = None,
                  search_type: str = 'text') -> List[Dict]:
@@ -48,33 +242,125 @@ class RAGEngine:
             print("⚠️  No storage manager connected")
             return []
         
-        # Search storage (now returns enriched results with text)
-        results = self.storage.search(query, top_k=top_k, search_type=search_type)
+        key = QueryCache.make_key(query, top_k, search_type, filters)
+        generation = getattr(self.storage, 'generation', 0)
+        
+        # Embed at most once, and only if the exact lookup misses
+        embedded = []
+        def embed_query():
+            if not embedded:
+                embedded.append(self._query_embedding(query))
+            return embedded[0]
+        
+        # Visual searches don't use the text embedding, so don't pay for one
+        semantic = self.semantic_cache and search_type != 'visual'
+        cached = self.cache.get(key, generation,
+                                embed_fn=embed_query if semantic else None)
+        if cached is not None:
+            return cached
+        
+        # Search storage (now returns enriched results with text); a cached
+        # query embedding lets storage skip the text encoder
+        query_embedding = embed_query() if search_type in ['text', 'both'] else None
+        results = self.storage.search(query, top_k=top_k, search_type=search_type,
+                                      query_embedding=query_embedding)
         
         # Apply filters if provided
         if filters:
             results = self._apply_filters(results, filters)
         
+        self.cache.put(key, results, generation,
+                       embedding=query_embedding if semantic else None)
         return results
     
-    def _apply_filters(self, results: List[Dict], filters: Dict) -> List[Dict]:
-        """Apply filters to results"""
-        filtered = results
+    def retrieve_batch(self, queries: List[str], top_k: int = 5, filters: Dict = None,
+                       search_type: str = 'text') -> List[List[Dict]]:
+        """
+        Retrieve context for several queries at once
+        
+        Cached queries are answered immediately; the rest are retrieved
+        concurrently on the engine's thread pool.
+        
+        Args:
+            queries: User queries
+            top_k: Number of results per query
+            filters: Optional filters applied to every query
+            search_type: 'text', 'visual', or 'both'
+            
+        Returns:
+            One result list per query, in input order
+        """
+        if self.storage is None:
+            print("⚠️  No storage manager connected")
+            return [[] for _ in queries]
+        
+        generation = getattr(self.storage, 'generation', 0)
+        answers: Dict[str, List[Dict]] = {}
+        misses = []
+        for query in dict.fromkeys(queries):
+            cached = self.cache.peek(QueryCache.make_key(query, top_k, search_type, filters), generation)
+            if cached is not None:
+                answers[query] = cached
+            else:
+                misses.append(query)
+        
+        if misses:
+            batch = self._executor.map(
+                lambda q: self.retrieve(q, top_k=top_k, filters=filters, search_type=search_type),
+                misses
+            )
+            answers.update(zip(misses, batch))
+        
+        return [list(answers[query]) for query in queries]
+    
+    def _query_embedding(self, query: str) -> Optional[np.ndarray]:
+        """Text embedding of the query, from cache when seen recently (None if unavailable)"""
+        key = hashlib.sha256(query.strip().encode('utf-8')).digest()
+        now = time.monotonic()
         
-        # Filter by source
-        if 'source' in filters:
-            filtered = [r for r in filtered if r.get('source') == filters['source']]
+        with self._emb_lock:
+            entry = self._emb_cache.get(key)
+            if entry is not None and now - entry[0] <= self.EMBEDDING_CACHE_TTL_SECONDS:
+                self._emb_cache.move_to_end(key)
+                return entry[1]
         
-        # Filter by type (text/visual)
-        if 'type' in filters:
-            filtered = [r for r in filtered if r.get('type') == filters['type']]
+        embed = getattr(self.storage, 'embed_query', None)
+        if embed is None:
+            return None
+        try:
+            embedding = embed(query)
+        except Exception:
+            return None
+        if embedding is None:
+            return None
         
-        # Filter by minimum score
-        if 'min_score' in filters:
-            min_score = filters['min_score']
-            filtered = [r for r in filtered if r.get('score', 0) >= min_score]
+        with self._emb_lock:
+            self._emb_cache[key] = (now, embedding)
+            self._emb_cache.move_to_end(key)
+            while len(self._emb_cache) > self.EMBEDDING_CACHE_SIZE:
+                self._emb_cache.popitem(last=False)
+        return embedding
+    
+    def invalidate_embedding_cache(self):
+        """Drop all cached query embeddings (e.g. after switching embedding model)"""
+        with self._emb_lock:
+            self._emb_cache.clear()
+    
+    def _apply_filters(self, results: List[Dict], filters: Dict) -> List[Dict]:
+        """Apply filters to results (single pass over all conditions)"""
+        check_source = 'source' in filters
+        check_type = 'type' in filters
+        check_score = 'min_score' in filters
+        source = filters.get('source')
+        result_type = filters.get('type')
+        min_score = filters.get('min_score')
         
-        return filtered
+        return [
+            r for r in results
+            if (not check_source or r.get('source') == source)
+            and (not check_type or r.get('type') == result_type)
+            and (not check_score or r.get('score', 0) >= min_score)
+        ]
     
     def build_context(self, results: List[Dict], max_tokens: int = 2000) -> str:
         """
@@ -82,14 +368,19 @@ class RAGEngine:
         
         Args:
             results: Retrieved documents (enriched with text content)
-            max_tokens: Maximum context length (approximate)
+            max_tokens: Maximum context length in tokens (exact with tiktoken,
+                ~4 chars/token otherwise)
             
         Returns:
             Formatted context string
         """
-        context_parts = []
-        total_chars = 0
-        max_chars = max_tokens * 4  # Rough approximation
+        return self.CONTEXT_SEPARATOR.join(self._iter_context_blocks(results, max_tokens))
+    
+    def _iter_context_blocks(self, results: List[Dict], max_tokens: int) -> Iterator[str]:
+        """Yield formatted result entries until the token budget is used up"""
+        enc = _encoding()
+        total = 0
+        budget = max_tokens if enc is not None else max_tokens * 4
         
         for i, result in enumerate(results, 1):
             # Get text from enriched result
@@ -101,6 +392,10 @@ class RAGEngine:
             
             if not text:
                 continue
+            
+            # Text alone already over the char budget: stop before formatting anything
+            if enc is None and total + len(text) + 1 > budget:
+                break
                 
             source = result.get('source', 'Unknown')
             score = result.get('score', 0.0)
@@ -131,24 +426,27 @@ class RAGEngine:
             # Format result entry
             header = f"[{i}] Source: {source} | Type: {result_type} | Relevance: {score:.2f}"
             if created_at:
-                header += f" | Date: {created_at[:10]}"
+                header = f"{header} | Date: {created_at[:10]}"
             
-            part = header + "\n"
+            entries = [header]
             if meta_parts:
-                part += " | ".join(meta_parts) + "\n"
-            part += text + "\n"
+                entries.append(" | ".join(meta_parts))
+            entries.append(text)
+            entries.append("")  # trailing newline
+            
+            if enc is not None:
+                part = "\n".join(entries)
+                part_len = len(enc.encode(part, disallowed_special=()))
+            else:
+                # Exact char length of the joined entry, checked before building it
+                part = None
+                part_len = sum(map(len, entries)) + len(entries) - 1
             
-            # Check if adding this would exceed limit
-            if total_chars + len(part) > max_chars:
+            if total + part_len > budget:
                 break
             
-            context_parts.append(part)
-            total_chars += len(part)
-        
-        if not context_parts:
-            return ""
-        
-        return "\n---\n".join(context_parts)
+            total += part_len
+            yield part if part is not None else "\n".join(entries)
     
     def generate_prompt(self, query: str, context: str, system_prompt: str = None) -> str:
         """
@@ -163,11 +461,7 @@ class RAGEngine:
             Complete prompt
         """
         if system_prompt is None:
-            system_prompt = (
-                "You are a helpful AI assistant with access to the user's personal knowledge base. "
-                "Use the provided context to answer the user's question accurately. "
-                "If the context doesn't contain relevant information, say so honestly."
-            )
+            system_prompt = self.DEFAULT_SYSTEM_PROMPT
         
         prompt = f"""{system_prompt}
 
@@ -181,24 +475,44 @@ Answer:"""
         return prompt
     
     def query(self, query: str, top_k: int = 5, search_type: str = 'text',
-              max_context_tokens: int = 2000) -> Dict:
+              max_context_tokens: int = 2000, system_prompt: str = None) -> Dict:
         """
-        Full RAG query - retrieve + build context in one call.
+        Full RAG query - retrieve, build context and prompt in one pass.
+        
+        Context blocks are written straight into the prompt buffer; the
+        context is recovered as a slice of the prompt.
         
         Args:
             query: User query
             top_k: Number of results
             search_type: 'text', 'visual', or 'both'
             max_context_tokens: Max context size
+            system_prompt: Optional system prompt
             
         Returns:
-            Dict with 'context', 'results', 'num_results'
+            Dict with 'prompt', 'context', 'results', 'num_results'
         """
         results = self.retrieve(query, top_k=top_k, search_type=search_type)
-        context = self.build_context(results, max_tokens=max_context_tokens)
+        
+        if system_prompt is None:
+            system_prompt = self.DEFAULT_SYSTEM_PROMPT
+        
+        head = f"{system_prompt}\n\nContext:\n"
+        pieces = [head]
+        context_len = 0
+        for block in self._iter_context_blocks(results, max_context_tokens):
+            if context_len:
+                pieces.append(self.CONTEXT_SEPARATOR)
+                context_len += len(self.CONTEXT_SEPARATOR)
+            pieces.append(block)
+            context_len += len(block)
+        pieces.append(f"\n\nUser Question: {query}\n\nAnswer:")
+        
+        prompt = "".join(pieces)
         
         return {
-            'context': context,
+            'prompt': prompt,
+            'context': prompt[len(head):len(head) + context_len],
             'results': results,
             'num_results': len(results),
         }
@@ -216,6 +530,16 @@ Answer:"""
             return stats
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
+    
+    def close(self):
+        """Shut down the retrieve_batch thread pool"""
+        self._executor.shutdown(wait=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 
 def test_rag_engine():
@@ -10,6 +10,16 @@ Handles:
 
 from typing import List, Tuple
 import re
+import unicodedata
+
+import numpy as np
+
+
+# Precompiled patterns (skip the re module's pattern-cache lookup per call)
+_WS_RE = re.compile(r'\s+')
+_SENT_BREAK = re.compile(r'[.!?]\s+')
+_SENT_SPLIT = re.compile(r'(?<=[.!?])\s+')
+_NON_WS = re.compile(r'\S')
 
 
 class TextProcessor:
@@ -20,6 +30,13 @@ class TextProcessor:
     CHUNK_SIZE_LONG = 1500
     CHUNK_OVERLAP = 150
     
+    # Characters dropped in clean_text: non-whitespace control characters
+    # (whitespace ones are collapsed to spaces) and zero-width characters
+    _CTRL_TABLE = dict.fromkeys(
+        [i for i in range(32) if not chr(i).isspace()]
+        + [0x200B, 0x200C, 0x200D, 0xFEFF]
+    )
+    
     def __init__(self):
         """Initialize text processor"""
         pass
@@ -48,6 +65,26 @@ class TextProcessor:
         Returns:
             List of (chunk_text, start_pos, end_pos) tuples
         """
+        # Short text is returned as-is (unstripped), as before
+        if len(text) <= (self.CHUNK_SIZE_LONG if chunk_size is None else chunk_size):
+            if chunk_size is not None and chunk_size <= 0:
+                raise ValueError("chunk_size must be > 0")
+            return [(text, 0, len(text))]
+        return [(self.get_chunk(text, start, end), start, end)
+                for start, end in self.chunk_spans(text, chunk_size, overlap)]
+    
+    def chunk_spans(self, text: str, chunk_size: int = None, overlap: int = None) -> List[Tuple[int, int]]:
+        """
+        Compute overlapping chunk boundaries without copying any text
+        
+        Args:
+            text: Input text
+            chunk_size: Chunk size (defaults to CHUNK_SIZE_LONG)
+            overlap: Overlap size (defaults to CHUNK_OVERLAP)
+            
+        Returns:
+            List of (start_pos, end_pos) tuples; slice with get_chunk()
+        """
         if chunk_size is None:
             chunk_size = self.CHUNK_SIZE_LONG
         if overlap is None:
@@ -61,36 +98,37 @@ class TextProcessor:
         
         # Don't chunk if text is short
         if len(text) <= chunk_size:
-            return [(text, 0, len(text))]
+            return [(0, len(text))]
         
-        chunks = []
+        # Sentence breaks for the whole text, found once: punctuation position
+        # and end of the following whitespace run (sorted, non-overlapping)
+        matches = [(m.start(), m.end()) for m in _SENT_BREAK.finditer(text)]
+        break_starts = np.fromiter((m[0] for m in matches), dtype=np.int64, count=len(matches))
+        break_ends = np.fromiter((m[1] for m in matches), dtype=np.int64, count=len(matches))
+        
+        spans = []
         start = 0
+        text_len = len(text)
         
-        while start < len(text):
+        while start < text_len:
             # Calculate end position
-            end = min(start + chunk_size, len(text))
-            
-            # Extract chunk
-            chunk = text[start:end]
+            end = min(start + chunk_size, text_len)
             
             # Try to break at sentence boundary if not at the end
-            if end < len(text):
-                # Look for sentence endings in the last 200 chars
-                search_start = max(0, len(chunk) - 200)
-                sentence_breaks = [m.end() for m in re.finditer(r'[.!?]\s+', chunk[search_start:])]
-                
-                if sentence_breaks:
-                    # Use the last sentence break
-                    break_pos = search_start + sentence_breaks[-1]
-                    chunk = chunk[:break_pos]
-                    end = start + break_pos
+            if end < text_len:
+                # Last sentence break whose punctuation and first whitespace
+                # char fall inside the final 200 chars of the window
+                search_start = start + max(0, (end - start) - 200)
+                idx = int(np.searchsorted(break_starts, end - 1, side='left')) - 1
+                if idx >= 0 and break_starts[idx] >= search_start:
+                    end = min(int(break_ends[idx]), end)
             
-            clean_chunk = chunk.strip()
-            if clean_chunk:
-                chunks.append((clean_chunk, start, end))
+            # Skip whitespace-only spans
+            if _NON_WS.search(text, start, end):
+                spans.append((start, end))
 
             # End reached: stop cleanly
-            if end >= len(text):
+            if end >= text_len:
                 break
 
             # Move to next chunk with overlap (must move forward)
@@ -99,7 +137,22 @@ class TextProcessor:
                 next_start = start + 1
             start = next_start
         
-        return chunks
+        return spans
+    
+    @staticmethod
+    def get_chunk(text: str, start: int, end: int) -> str:
+        """
+        Materialize one chunk from a span returned by chunk_spans()
+        
+        Args:
+            text: Original text
+            start: Span start
+            end: Span end
+            
+        Returns:
+            Stripped chunk text
+        """
+        return text[start:end].strip()
     
     def clean_text(self, text: str) -> str:
         """
@@ -111,11 +164,14 @@ class TextProcessor:
         Returns:
             Cleaned text
         """
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+        # Compose/compatibility-fold (e.g. separated diacritics, ligatures, NBSP)
+        text = unicodedata.normalize('NFKC', text)
+        
+        # Remove control and zero-width characters (str.translate runs in C)
+        text = text.translate(self._CTRL_TABLE)
         
-        # Remove control characters
-        text = ''.join(char for char in text if ord(char) >= 32 or char in '\n\t')
+        # Remove excessive whitespace
+        text = _WS_RE.sub(' ', text)
         
         return text.strip()
     
@@ -130,7 +186,7 @@ class TextProcessor:
             List of sentences
         """
         # Simple sentence splitting
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = _SENT_SPLIT.split(text)
         return [s.strip() for s in sentences if s.strip()]
     
     def get_word_count(self, text: str) -> int:
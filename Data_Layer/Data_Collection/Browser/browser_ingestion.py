@@ -8,13 +8,59 @@ import sqlite3
 import json
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import shutil
-from dataclasses import dataclass, asdict
-from urllib.parse import urlparse, parse_qs, unquote
+import sys
+import tempfile
+import warnings
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from json.encoder import encode_basestring as _encode_basestring
+from operator import itemgetter
+from urllib.parse import urlsplit, unquote
 
+import numpy as np
 
-@dataclass
+# Chromium timestamps are microseconds since 1601-01-01 (UTC)
+_CHROME_EPOCH_US = np.datetime64('1601-01-01T00:00:00', 'us')
+FETCH_BATCH_SIZE = 1000
+
+# Monthly exports go to Data_Layer/Data_Storage
+EXPORT_DIR = Path(__file__).parent.parent.parent / "Data_Storage"
+
+# Sort key for (exact_timestamp, record) export entries
+_EXACT_TIMESTAMP_OF = itemgetter(0)
+
+# Read-only scan tuning: 64 MB page cache, mmap'd reads, in-memory temp sorts
+READ_PRAGMAS = """
+    PRAGMA query_only = 1;
+    PRAGMA cache_size = -65536;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA temp_store = MEMORY;
+"""
+
+# Files SQLite keeps next to a database; copied and cleaned up with it
+_DB_SIDECAR_SUFFIXES = ('-wal', '-shm', '-journal')
+# Header of a live rollback journal (zeroed once the transaction commits)
+_SQLITE_JOURNAL_MAGIC = bytes.fromhex('d9d505f920a163d7')
+
+try:
+    import orjson  # Fast C/SIMD JSON parser/serializer; falls back to stdlib json
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard  # Optional compression of monthly exports
+except ImportError:
+    zstandard = None
+
+
+# __slots__ drops the per-record __dict__ (dataclass slots need Python 3.10+)
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class BrowserRecord:
     """Represents a single browser history or bookmark record"""
     url: str
@@ -29,7 +75,48 @@ class BrowserRecord:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
-        return asdict(self)
+        # Plain field copy; asdict() deep-copies through dataclasses.fields()
+        return {
+            'url': self.url,
+            'title': self.title,
+            'visit_count': self.visit_count,
+            'last_visit_time': self.last_visit_time,
+            'record_type': self.record_type,
+            'browser': self.browser,
+            'folder': self.folder,
+            'tags': list(self.tags) if self.tags is not None else None,
+            'search_query': self.search_query,
+        }
+
+
+def _json_str(value: Optional[str]) -> str:
+    """JSON string literal (C-escaped) or null"""
+    return 'null' if value is None else _encode_basestring(value)
+
+
+def _json_value(value: Any) -> str:
+    """Compact JSON for an arbitrary field value"""
+    if type(value) is int:
+        return str(value)
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+def _export_record_json(record: BrowserRecord, exact_timestamp: str) -> bytes:
+    """
+    Compact export JSON for one record, specialized to the BrowserRecord schema
+    
+    Same bytes as json.dumps of to_dict() plus exact_timestamp/time_of_day,
+    without building the dict or dispatching on each value's type.
+    """
+    return (
+        f'{{"url":{_json_str(record.url)},"title":{_json_str(record.title)},'
+        f'"visit_count":{_json_value(record.visit_count)},'
+        f'"last_visit_time":{_json_str(record.last_visit_time)},'
+        f'"record_type":{_json_str(record.record_type)},"browser":{_json_str(record.browser)},'
+        f'"folder":{_json_str(record.folder)},"tags":{_json_value(record.tags)},'
+        f'"search_query":{_json_str(record.search_query)},'
+        f'"exact_timestamp":{_json_str(exact_timestamp)},"time_of_day":{_json_str(exact_timestamp[11:19])}}}'
+    ).encode('utf-8')
 
 
 class BrowserDataExtractor:
@@ -45,6 +132,7 @@ class BrowserDataExtractor:
         
         # Common search query parameters
         self.search_params = ['q', 'query', 'search', 's', 'searchTerm', 'term', 'keyword', 'k']
+        self._search_param_rank = {name: i for i, name in enumerate(self.search_params)}
         
         # Browser database paths (Windows) - now supports multiple profiles
         self.browser_paths = {
@@ -61,88 +149,389 @@ class BrowserDataExtractor:
     def _get_chrome_profiles(self) -> List[str]:
         """Detect all Chrome profile directories"""
         chrome_base = Path(os.getenv('LOCALAPPDATA')) / 'Google' / 'Chrome' / 'User Data'
-        profiles = []
-        
-        if chrome_base.exists():
-            # Add Default profile
-            if (chrome_base / 'Default').exists():
-                profiles.append('Default')
-            
-            # Add numbered profiles (Profile 1, Profile 2, etc.)
-            for i in range(1, 20):  # Support up to 19 additional profiles
-                profile_name = f'Profile {i}'
-                if (chrome_base / profile_name).exists():
-                    profiles.append(profile_name)
-        
-        return profiles
+        return self._scan_chromium_profiles(chrome_base)
     
     def _get_edge_profiles(self) -> List[str]:
         """Detect all Edge profile directories"""
         edge_base = Path(os.getenv('LOCALAPPDATA')) / 'Microsoft' / 'Edge' / 'User Data'
-        profiles = []
+        return self._scan_chromium_profiles(edge_base)
+    
+    @staticmethod
+    def _scan_chromium_profiles(user_data: Path) -> List[str]:
+        """
+        List 'Default' and 'Profile N' directories with a single directory read
         
-        if edge_base.exists():
-            # Add Default profile
-            if (edge_base / 'Default').exists():
-                profiles.append('Default')
+        Args:
+            user_data: Chromium 'User Data' directory
             
-            # Add numbered profiles
-            for i in range(1, 20):
-                profile_name = f'Profile {i}'
-                if (edge_base / profile_name).exists():
-                    profiles.append(profile_name)
+        Returns:
+            Profile names, Default first then numbered profiles in order
+        """
+        has_default = False
+        numbered = []
+        
+        try:
+            with os.scandir(user_data) as it:
+                for entry in it:
+                    name = entry.name
+                    if name == 'Default':
+                        has_default = entry.is_dir()
+                    elif name.startswith('Profile ') and name[8:].isdigit() and entry.is_dir():
+                        numbered.append((int(name[8:]), name))
+        except OSError:
+            return []
         
+        profiles = ['Default'] if has_default else []
+        profiles.extend(name for _, name in sorted(numbered))
         return profiles
     
     def _get_firefox_profile(self) -> Optional[Path]:
         """Get the default Firefox profile path"""
         firefox_profiles = self.browser_paths['firefox']['history']
         
-        if firefox_profiles.exists():
-            profiles = [p for p in firefox_profiles.iterdir() if p.is_dir() and p.name.endswith('.default-release')]
-            if profiles:
-                return profiles[0]
+        try:
+            with os.scandir(firefox_profiles) as it:
+                for entry in it:
+                    if entry.name.endswith('.default-release') and entry.is_dir():
+                        return Path(entry.path)
+        except OSError:
+            pass
         return None
     
+    @staticmethod
+    def _has_pending_writes(db_path: Path) -> bool:
+        """
+        True if the browser may be mid-write: a non-empty -wal or a hot rollback -journal
+        
+        Reading such a file with immutable=1 can see torn pages, so callers copy it instead.
+        """
+        wal_path = db_path.with_name(db_path.name + '-wal')
+        try:
+            if wal_path.stat().st_size > 0:
+                return True
+        except OSError:
+            pass
+        
+        # A journal only matters if its header is intact (PERSIST mode zeroes it)
+        journal_path = db_path.with_name(db_path.name + '-journal')
+        try:
+            with open(journal_path, 'rb') as f:
+                return f.read(len(_SQLITE_JOURNAL_MAGIC)) == _SQLITE_JOURNAL_MAGIC
+        except FileNotFoundError:
+            return False
+        except OSError:
+            # Locked by the browser: assume a write is in progress
+            return True
+    
+    @staticmethod
+    def _copy_db(db_path: Path, temp_path: Path):
+        """Snapshot a database with its -wal/-shm/-journal so SQLite can replay or roll back"""
+        shutil.copyfile(db_path, temp_path)
+        for suffix in _DB_SIDECAR_SUFFIXES:
+            sibling = db_path.with_name(db_path.name + suffix)
+            if sibling.exists():
+                shutil.copyfile(sibling, temp_path.with_name(temp_path.name + suffix))
+    
+    @classmethod
+    def _connect_readonly(cls, db_path: Path, temp_path: Path,
+                          in_place: bool = True) -> Tuple[sqlite3.Connection, bool]:
+        """
+        Open a browser database without copying it when possible
+        
+        The live file is opened read-only with immutable=1 (no locks, no copy).
+        If the browser has pending WAL or journal content, or the file can't be
+        opened in place, the database and its sidecar files are copied to temp_path.
+        
+        Args:
+            db_path: Live browser database
+            temp_path: Where to put the fallback copy
+            in_place: Try the immutable in-place open first
+            
+        Returns:
+            (sqlite3 connection, True if it reads the live file in place)
+        """
+        if in_place and not cls._has_pending_writes(db_path):
+            try:
+                conn = sqlite3.connect(f"{db_path.absolute().as_uri()}?mode=ro&immutable=1", uri=True)
+                conn.execute("SELECT 1 FROM sqlite_master LIMIT 1")
+                conn.executescript(READ_PRAGMAS)
+                return conn, True
+            except sqlite3.Error:
+                pass
+        
+        cls._copy_db(db_path, temp_path)
+        conn = sqlite3.connect(temp_path)
+        conn.executescript(READ_PRAGMAS)
+        return conn, False
+    
+    @classmethod
+    def _read_rows(cls, db_path: Path, temp_path: Path, query: str, params: tuple = ()) -> List:
+        """
+        Run a read query against a browser database and return all rows
+        
+        If an in-place read fails partway (the browser rewrote pages under an
+        immutable connection), the partial rows are dropped and the query is
+        rerun on a copy.
+        """
+        in_place = True
+        while True:
+            conn, in_place = cls._connect_readonly(db_path, temp_path, in_place)
+            try:
+                cursor = conn.execute(query, params)
+                cursor.arraysize = FETCH_BATCH_SIZE
+                rows = []
+                while True:
+                    batch = cursor.fetchmany()
+                    if not batch:
+                        return rows
+                    rows.extend(batch)
+            except sqlite3.DatabaseError:
+                if not in_place:
+                    raise
+                in_place = False
+            finally:
+                conn.close()
+    
+    @staticmethod
+    def _temp_db_path(label: str) -> Path:
+        """Per-process path in the system temp dir for a fallback database copy"""
+        return Path(tempfile.gettempdir()) / f"temp_{label}_{os.getpid()}"
+    
+    @staticmethod
+    def _remove_temp_db(temp_path: Path):
+        """Delete a fallback database copy and its sidecar files"""
+        for path in (temp_path, *(temp_path.with_name(temp_path.name + suffix)
+                                  for suffix in _DB_SIDECAR_SUFFIXES)):
+            if path.exists():
+                try:
+                    path.unlink()
+                except:
+                    pass
+    
     def _extract_search_query(self, url: str) -> Optional[str]:
         """Extract search query from URL if present"""
         try:
-            parsed = urlparse(url)
-            params = parse_qs(parsed.query)
+            if '[' in url or ']' in url:
+                # Let urlsplit validate (and reject) bracketed hosts
+                query_string = urlsplit(url).query
+            else:
+                # urlsplit drops these anywhere in the URL
+                if '\t' in url or '\r' in url or '\n' in url:
+                    url = url.replace('\t', '').replace('\r', '').replace('\n', '')
+                # Query string only: strip the fragment first, then take what follows '?'
+                query_string = url.partition('#')[0].partition('?')[2]
+            if not query_string:
+                return None
             
-            # Check common search parameters
-            for param in self.search_params:
-                if param in params and params[param]:
-                    query = unquote(params[param][0])
-                    return query
+            # Same pair rules as parse_qs: '&'-separated, blank values skipped,
+            # names decoded; earliest entry in search_params wins, first occurrence per name
+            best_rank = len(self.search_params)
+            best_value = None
+            for pair in query_string.split('&'):
+                name, _, value = pair.partition('=')
+                if not value:
+                    continue
+                if '%' in name or '+' in name:
+                    name = unquote(name.replace('+', ' '))
+                rank = self._search_param_rank.get(name)
+                if rank is not None and rank < best_rank:
+                    best_rank, best_value = rank, value
+                    if rank == 0:
+                        break
+            if best_value is None:
+                return None
             
-            return None
+            # Same decoding as parse_qs (plus + percent) followed by unquote
+            return unquote(unquote(best_value.replace('+', ' ')))
         except:
             return None
     
     def extract_chrome_history(self, days_back: int = 30, limit: int = 1000) -> List[BrowserRecord]:
         """Extract Chrome browsing history from all profiles"""
-        all_records = []
-        
-        for profile_name in self.chrome_profiles:
-            records = self._extract_chromium_history_from_profile(
-                'chrome', profile_name, days_back, limit
-            )
-            all_records.extend(records)
-        
-        return all_records
+        return self._extract_chromium_history('chrome', self.chrome_profiles, days_back, limit)
     
     def extract_edge_history(self, days_back: int = 30, limit: int = 1000) -> List[BrowserRecord]:
         """Extract Edge browsing history from all profiles"""
-        all_records = []
+        return self._extract_chromium_history('edge', self.edge_profiles, days_back, limit)
+    
+    @staticmethod
+    def _map_profiles(extract_fn, profiles: List[str]) -> List[BrowserRecord]:
+        """Run a per-profile extractor over all profiles in parallel, keeping profile order"""
+        if len(profiles) <= 1:
+            return [record for profile in profiles for record in extract_fn(profile)]
         
-        for profile_name in self.edge_profiles:
-            records = self._extract_chromium_history_from_profile(
-                'edge', profile_name, days_back, limit
-            )
-            all_records.extend(records)
+        # SQLite and file reads release the GIL, so profiles overlap
+        with ThreadPoolExecutor(max_workers=min(8, len(profiles))) as executor:
+            return [record for records in executor.map(extract_fn, profiles) for record in records]
+    
+    @staticmethod
+    def _chromium_history_path(browser: str, profile_name: str) -> Path:
+        """History database of a Chrome or Edge profile"""
+        if browser == 'chrome':
+            base_path = Path(os.getenv('LOCALAPPDATA')) / 'Google' / 'Chrome' / 'User Data'
+        else:  # edge
+            base_path = Path(os.getenv('LOCALAPPDATA')) / 'Microsoft' / 'Edge' / 'User Data'
+        return base_path / profile_name / 'History'
+    
+    @staticmethod
+    def _chromium_threshold(days_back: int) -> int:
+        """Oldest last_visit_time to keep, in Chrome microseconds since 1601"""
+        chrome_epoch = datetime(1601, 1, 1)
+        time_threshold = datetime.now() - timedelta(days=days_back)
+        return int((time_threshold - chrome_epoch).total_seconds() * 1_000_000)
+    
+    def _extract_chromium_history(
+        self,
+        browser: str,
+        profiles: List[str],
+        days_back: int,
+        limit: int
+    ) -> List[BrowserRecord]:
+        """
+        Extract history from several profiles of one Chromium browser
+        
+        The profiles are attached to one SQLite connection and read with a
+        single UNION ALL query.
+        
+        Args:
+            browser: 'chrome' or 'edge'
+            profiles: Profile directory names
+            days_back: Days of history to extract
+            limit: Maximum records per profile
+            
+        Returns:
+            Records grouped by profile, in profile order
+        """
+        threshold_microseconds = self._chromium_threshold(days_back)
+        rows_by_profile: Dict[str, List] = {}
+        pending = []  # (profile_name, history_path)
+        
+        for profile_name in profiles:
+            history_path = self._chromium_history_path(browser, profile_name)
+            if history_path.exists():
+                pending.append((profile_name, history_path))
+        
+        if len(pending) > 1:
+            union_rows = self._query_attached_history(browser, pending, threshold_microseconds, limit)
+            if union_rows is not None:
+                rows_by_profile.update(union_rows)
+                pending = [entry for entry in pending if entry[0] not in union_rows]
         
-        return all_records
+        records = []
+        for profile_name in profiles:
+            if profile_name in rows_by_profile:
+                rows = rows_by_profile[profile_name]
+                browser_label = f"{browser} ({profile_name})"
+                for start in range(0, len(rows), FETCH_BATCH_SIZE):
+                    records.extend(self._chromium_rows_to_records(
+                        rows[start:start + FETCH_BATCH_SIZE], browser_label
+                    ))
+            elif any(name == profile_name for name, _ in pending):
+                # Single profile, not attached, or the combined query failed: read it on its own
+                records.extend(self._extract_chromium_history_from_profile(
+                    browser, profile_name, days_back, limit
+                ))
+        
+        return records
+    
+    def _query_attached_history(
+        self,
+        browser: str,
+        pending: List,
+        threshold: int,
+        limit: int
+    ) -> Optional[Dict[str, List]]:
+        """
+        Read several History databases through one connection
+        
+        Args:
+            browser: 'chrome' or 'edge'
+            pending: (profile_name, history_path) per profile
+            threshold: Minimum last_visit_time (exclusive)
+            limit: Maximum rows per profile
+            
+        Returns:
+            Rows per profile name, or None if the combined query failed.
+            Profiles that couldn't be attached (or beyond the attach limit)
+            are left out, for the caller to read one by one.
+        """
+        temp_paths = []
+        try:
+            # URI mode on the main connection lets ATTACH open files immutable
+            conn = sqlite3.connect('file::memory:', uri=True)
+        except sqlite3.Error:
+            return None
+        
+        try:
+            attached = []  # (profile_name, history_path)
+            for profile_name, history_path in pending:
+                # Default SQLITE_MAX_ATTACHED is 10; later profiles fall back to per-profile reads
+                if len(attached) == 10:
+                    break
+                schema = f"p{len(attached)}"
+                temp_path = self._temp_db_path(f"{browser}_{profile_name.replace(' ', '_')}_history")
+                temp_paths.append(temp_path)
+                try:
+                    self._attach_readonly(conn, schema, history_path, temp_path)
+                except (PermissionError, sqlite3.DatabaseError):
+                    # Left to the per-profile path (which skips it if still locked)
+                    continue
+                attached.append((profile_name, history_path))
+            
+            if not attached:
+                return {}
+            
+            # Per-profile ORDER BY/LIMIT keeps the same rows as separate queries
+            query = " UNION ALL ".join(
+                f"SELECT * FROM (SELECT {i}, url, title, visit_count, last_visit_time "
+                f"FROM p{i}.urls WHERE last_visit_time > ? "
+                f"ORDER BY last_visit_time DESC LIMIT ?)"
+                for i in range(len(attached))
+            ) + " ORDER BY 1, 5 DESC"
+            
+            cursor = conn.execute(query, (threshold, limit) * len(attached))
+            cursor.arraysize = FETCH_BATCH_SIZE
+            grouped: List[List] = [[] for _ in attached]
+            
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                for row in rows:
+                    grouped[row[0]].append(row[1:])
+            
+            return {profile_name: rows for (profile_name, _), rows in zip(attached, grouped)}
+            
+        except Exception as e:
+            print(f"⚠️  Combined {browser} history query failed, reading profiles separately: {e}")
+            return None
+        finally:
+            conn.close()
+            for temp_path in temp_paths:
+                self._remove_temp_db(temp_path)
+    
+    @staticmethod
+    def _attach_readonly(conn: sqlite3.Connection, schema: str, db_path: Path, temp_path: Path):
+        """
+        ATTACH a browser database read-only, copying it first if it has pending writes
+        
+        Same strategy as _connect_readonly, for a connection opened in URI mode.
+        """
+        if not BrowserDataExtractor._has_pending_writes(db_path):
+            try:
+                conn.execute(f"ATTACH DATABASE ? AS {schema}",
+                             (f"{db_path.absolute().as_uri()}?mode=ro&immutable=1",))
+                conn.execute(f"SELECT 1 FROM {schema}.sqlite_master LIMIT 1")
+                return
+            except sqlite3.Error:
+                try:
+                    conn.execute(f"DETACH DATABASE {schema}")
+                except sqlite3.Error:
+                    pass
+        
+        BrowserDataExtractor._copy_db(db_path, temp_path)
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (temp_path.absolute().as_uri(),))
+        conn.execute(f"SELECT 1 FROM {schema}.sqlite_master LIMIT 1")
     
     def _extract_chromium_history_from_profile(
         self, 
@@ -153,33 +542,19 @@ class BrowserDataExtractor:
     ) -> List[BrowserRecord]:
         """Extract history from a specific Chromium browser profile"""
         records = []
-        
-        # Determine base path
-        if browser == 'chrome':
-            base_path = Path(os.getenv('LOCALAPPDATA')) / 'Google' / 'Chrome' / 'User Data'
-        else:  # edge
-            base_path = Path(os.getenv('LOCALAPPDATA')) / 'Microsoft' / 'Edge' / 'User Data'
-        
-        history_path = base_path / profile_name / 'History'
+        history_path = self._chromium_history_path(browser, profile_name)
         
         if not history_path.exists():
             return records
         
+        # Calculate the time threshold
+        threshold_microseconds = self._chromium_threshold(days_back)
+        browser_label = f"{browser} ({profile_name})"
+        
         # Create a temporary copy to avoid database lock issues
-        temp_path = Path(f"temp_{browser}_{profile_name.replace(' ', '_')}_history")
+        temp_path = self._temp_db_path(f"{browser}_{profile_name.replace(' ', '_')}_history")
         
         try:
-            # Copy the database file
-            shutil.copy2(history_path, temp_path)
-            
-            conn = sqlite3.connect(temp_path)
-            cursor = conn.cursor()
-            
-            # Calculate the time threshold
-            chrome_epoch = datetime(1601, 1, 1)
-            time_threshold = datetime.now() - timedelta(days=days_back)
-            threshold_microseconds = int((time_threshold - chrome_epoch).total_seconds() * 1_000_000)
-            
             query = """
                 SELECT url, title, visit_count, last_visit_time
                 FROM urls
@@ -188,29 +563,12 @@ class BrowserDataExtractor:
                 LIMIT ?
             """
             
-            cursor.execute(query, (threshold_microseconds, limit))
-            
-            for row in cursor.fetchall():
-                url, title, visit_count, last_visit_time = row
-                
-                # Convert Chrome timestamp to datetime
-                visit_datetime = chrome_epoch + timedelta(microseconds=last_visit_time)
-                
-                # Extract search query if present
-                search_query = self._extract_search_query(url)
-                
-                record = BrowserRecord(
-                    url=url,
-                    title=title or url,
-                    visit_count=visit_count,
-                    last_visit_time=visit_datetime.isoformat(),
-                    record_type='history',
-                    browser=f"{browser} ({profile_name})",
-                    search_query=search_query
-                )
-                records.append(record)
-            
-            conn.close()
+            # Read in place; copies only if the database can't be read directly
+            all_rows = self._read_rows(history_path, temp_path, query, (threshold_microseconds, limit))
+            for start in range(0, len(all_rows), FETCH_BATCH_SIZE):
+                records.extend(self._chromium_rows_to_records(
+                    all_rows[start:start + FETCH_BATCH_SIZE], browser_label
+                ))
             
         except (PermissionError, sqlite3.DatabaseError) as e:
             # Silently skip if browser is open and database is locked
@@ -218,15 +576,33 @@ class BrowserDataExtractor:
         except Exception as e:
             print(f"Error extracting {browser} ({profile_name}) history: {e}")
         finally:
-            # Clean up temp file
-            if temp_path.exists():
-                try:
-                    temp_path.unlink()
-                except:
-                    pass
+            # Clean up temp files (only created by the copy fallback)
+            self._remove_temp_db(temp_path)
         
         return records
     
+    def _chromium_rows_to_records(self, rows: List, browser_label: str) -> List[BrowserRecord]:
+        """Build history records from (url, title, visit_count, last_visit_time) rows"""
+        # Convert the batch's Chrome timestamps to ISO strings in one numpy op
+        visit_times = np.fromiter((row[3] for row in rows), dtype=np.int64, count=len(rows))
+        iso_times = np.datetime_as_string(
+            _CHROME_EPOCH_US + visit_times.astype('timedelta64[us]'), unit='us'
+        )
+        
+        return [
+            BrowserRecord(
+                url=url,
+                title=title or url,
+                visit_count=visit_count,
+                # Match datetime.isoformat(), which omits zero microseconds
+                last_visit_time=iso_time[:-7] if iso_time.endswith('.000000') else iso_time,
+                record_type='history',
+                browser=browser_label,
+                search_query=self._extract_search_query(url)
+            )
+            for (url, title, visit_count, _), iso_time in zip(rows, iso_times.tolist())
+        ]
+    
     def extract_firefox_history(self, days_back: int = 30, limit: int = 1000) -> List[BrowserRecord]:
         """Extract Firefox browsing history"""
         records = []
@@ -240,13 +616,8 @@ class BrowserDataExtractor:
         if not history_path.exists():
             return records
         
-        temp_path = Path("temp_firefox_history")
+        temp_path = self._temp_db_path("firefox_history")
         try:
-            shutil.copy2(history_path, temp_path)
-            
-            conn = sqlite3.connect(temp_path)
-            cursor = conn.cursor()
-            
             # Calculate time threshold (Firefox uses Unix timestamps in microseconds)
             time_threshold = int((datetime.now() - timedelta(days=days_back)).timestamp() * 1_000_000)
             
@@ -258,17 +629,12 @@ class BrowserDataExtractor:
                 LIMIT ?
             """
             
-            cursor.execute(query, (time_threshold, limit))
+            rows = self._read_rows(history_path, temp_path, query, (time_threshold, limit))
             
-            for row in cursor.fetchall():
-                url, title, visit_count, last_visit_time = row
-                
-                # Convert Firefox timestamp to datetime
+            for url, title, visit_count, last_visit_time in rows:
+                # Convert Firefox timestamp to local datetime (stays per-row: DST-aware)
                 visit_datetime = datetime.fromtimestamp(last_visit_time / 1_000_000) if last_visit_time else datetime.now()
                 
-                # Extract search query if present
-                search_query = self._extract_search_query(url)
-                
                 record = BrowserRecord(
                     url=url,
                     title=title or url,
@@ -276,42 +642,30 @@ class BrowserDataExtractor:
                     last_visit_time=visit_datetime.isoformat(),
                     record_type='history',
                     browser='firefox',
-                    search_query=search_query
+                    search_query=self._extract_search_query(url)
                 )
                 records.append(record)
             
-            conn.close()
-            
         except Exception as e:
             print(f"Error extracting Firefox history: {e}")
         finally:
-            if temp_path.exists():
-                try:
-                    temp_path.unlink()
-                except:
-                    pass
+            self._remove_temp_db(temp_path)
         
         return records
     
     def extract_chrome_bookmarks(self) -> List[BrowserRecord]:
         """Extract Chrome bookmarks from all profiles"""
-        all_records = []
-        
-        for profile_name in self.chrome_profiles:
-            records = self._extract_chromium_bookmarks_from_profile('chrome', profile_name)
-            all_records.extend(records)
-        
-        return all_records
+        return self._map_profiles(
+            lambda profile_name: self._extract_chromium_bookmarks_from_profile('chrome', profile_name),
+            self.chrome_profiles
+        )
     
     def extract_edge_bookmarks(self) -> List[BrowserRecord]:
         """Extract Edge bookmarks from all profiles"""
-        all_records = []
-        
-        for profile_name in self.edge_profiles:
-            records = self._extract_chromium_bookmarks_from_profile('edge', profile_name)
-            all_records.extend(records)
-        
-        return all_records
+        return self._map_profiles(
+            lambda profile_name: self._extract_chromium_bookmarks_from_profile('edge', profile_name),
+            self.edge_profiles
+        )
     
     def _extract_chromium_bookmarks_from_profile(self, browser: str, profile_name: str) -> List[BrowserRecord]:
         """Extract bookmarks from a specific Chromium browser profile"""
@@ -329,38 +683,43 @@ class BrowserDataExtractor:
             return records
         
         try:
-            with open(bookmarks_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Parse bookmark tree
-            def parse_bookmark_node(node, folder_path=""):
-                if node.get('type') == 'url':
-                    # Extract search query if present
-                    search_query = self._extract_search_query(node.get('url', ''))
-                    
+            if orjson is not None:
+                data = orjson.loads(bookmarks_path.read_bytes())
+            else:
+                with open(bookmarks_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            
+            browser_label = f"{browser} ({profile_name})"
+            
+            # Walk the bookmark tree depth-first with an explicit stack
+            # (children pushed in reverse so they pop in document order)
+            stack = []
+            roots = data.get('roots', {})
+            for root_name, root_node in reversed(list(roots.items())):
+                if isinstance(root_node, dict) and 'children' in root_node:
+                    stack.extend((child, root_name) for child in reversed(root_node['children']))
+            
+            while stack:
+                node, folder_path = stack.pop()
+                node_type = node.get('type')
+                
+                if node_type == 'url':
+                    url = node.get('url', '')
                     record = BrowserRecord(
-                        url=node.get('url', ''),
+                        url=url,
                         title=node.get('name', ''),
                         visit_count=0,
                         last_visit_time=datetime.now().isoformat(),
                         record_type='bookmark',
-                        browser=f"{browser} ({profile_name})",
+                        browser=browser_label,
                         folder=folder_path,
-                        search_query=search_query
+                        search_query=self._extract_search_query(url)
                     )
                     records.append(record)
-                elif node.get('type') == 'folder':
+                elif node_type == 'folder':
                     folder_name = node.get('name', '')
                     new_path = f"{folder_path}/{folder_name}" if folder_path else folder_name
-                    for child in node.get('children', []):
-                        parse_bookmark_node(child, new_path)
-            
-            # Parse all bookmark roots
-            roots = data.get('roots', {})
-            for root_name, root_node in roots.items():
-                if isinstance(root_node, dict) and 'children' in root_node:
-                    for child in root_node['children']:
-                        parse_bookmark_node(child, root_name)
+                    stack.extend((child, new_path) for child in reversed(node.get('children', [])))
         
         except Exception as e:
             print(f"Error extracting {browser} ({profile_name}) bookmarks: {e}")
@@ -380,13 +739,8 @@ class BrowserDataExtractor:
         if not bookmarks_path.exists():
             return records
         
-        temp_path = Path("temp_firefox_bookmarks")
+        temp_path = self._temp_db_path("firefox_bookmarks")
         try:
-            shutil.copy2(bookmarks_path, temp_path)
-            
-            conn = sqlite3.connect(temp_path)
-            cursor = conn.cursor()
-            
             query = """
                 SELECT p.url, p.title, p.visit_count, b.dateAdded, b.parent
                 FROM moz_places p
@@ -395,9 +749,7 @@ class BrowserDataExtractor:
                 ORDER BY b.dateAdded DESC
             """
             
-            cursor.execute(query)
-            
-            for row in cursor.fetchall():
+            for row in self._read_rows(bookmarks_path, temp_path, query):
                 url, title, visit_count, date_added, parent_id = row
                 
                 # Convert timestamp
@@ -413,16 +765,10 @@ class BrowserDataExtractor:
                 )
                 records.append(record)
             
-            conn.close()
-            
         except Exception as e:
             print(f"Error extracting Firefox bookmarks: {e}")
         finally:
-            if temp_path.exists():
-                try:
-                    temp_path.unlink()
-                except:
-                    pass
+            self._remove_temp_db(temp_path)
         
         return records
     
@@ -437,102 +783,257 @@ class BrowserDataExtractor:
         Returns:
             Dictionary mapping browser names to lists of records
         """
-        all_data = {}
-        
-        # Chrome
-        print("Extracting Chrome data...")
-        chrome_history = self.extract_chrome_history(days_back, limit_per_browser)
-        chrome_bookmarks = self.extract_chrome_bookmarks()
-        all_data['chrome'] = chrome_history + chrome_bookmarks
-        
-        # Edge
-        print("Extracting Edge data...")
-        edge_history = self.extract_edge_history(days_back, limit_per_browser)
-        edge_bookmarks = self.extract_edge_bookmarks()
-        all_data['edge'] = edge_history + edge_bookmarks
-        
-        # Firefox
-        print("Extracting Firefox data...")
-        firefox_history = self.extract_firefox_history(days_back, limit_per_browser)
-        firefox_bookmarks = self.extract_firefox_bookmarks()
-        all_data['firefox'] = firefox_history + firefox_bookmarks
+        extractors = {
+            'chrome': (self.extract_chrome_history, self.extract_chrome_bookmarks),
+            'edge': (self.extract_edge_history, self.extract_edge_bookmarks),
+            'firefox': (self.extract_firefox_history, self.extract_firefox_bookmarks),
+        }
+        
+        # History and bookmarks of every browser are independent: run all six at once
+        print("Extracting Chrome, Edge and Firefox data...")
+        with ThreadPoolExecutor(max_workers=2 * len(extractors)) as executor:
+            futures = {
+                browser: (executor.submit(history, days_back, limit_per_browser), executor.submit(bookmarks))
+                for browser, (history, bookmarks) in extractors.items()
+            }
+            all_data = {
+                browser: history.result() + bookmarks.result()
+                for browser, (history, bookmarks) in futures.items()
+            }
         
         return all_data
     
-    def export_by_month(self, records: List[BrowserRecord]):
-        """Export records grouped by month into separate files"""
-        # Group by month
-        by_month = {}
+    @staticmethod
+    def _json_bytes(data: Any, indent: bool = False) -> bytes:
+        """UTF-8 JSON, compact unless indent (orjson when available)"""
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+            return orjson.dumps(data, option=option)
+        if indent:
+            return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    
+    def _record_bytes(self, record: BrowserRecord, exact_timestamp: str) -> bytes:
+        """Compact export JSON for one record, with exact_timestamp and time_of_day"""
+        if orjson is None:
+            # Stdlib json is the slow path: use the schema-specialized writer
+            return _export_record_json(record, exact_timestamp)
+        record_dict = record.to_dict()
+        record_dict['exact_timestamp'] = exact_timestamp
+        record_dict['time_of_day'] = exact_timestamp[11:19]  # HH:MM:SS of the ISO string
+        return self._json_bytes(record_dict)
+    
+    def _write_month_json(self, output_file: Path, header: Dict[str, Any], by_day: Dict[str, List]):
+        """
+        Stream a monthly file record by record, as compact JSON
+        
+        Produces the same document as dumping {**header, 'records_by_day': ...},
+        but only one record dict exists at a time instead of the whole month
+        plus its serialized copy.
+        
+        Args:
+            output_file: Monthly JSON file (zstd-compressed if it ends in .zst)
+            header: Top-level fields written before records_by_day
+            by_day: date_key -> [(exact_timestamp, record)], newest first
+        """
+        dumps = self._json_bytes
+        compress = output_file.suffix == '.zst'
         
-        for record in records:
-            # Parse the timestamp to get the month
-            timestamp = datetime.fromisoformat(record.last_visit_time)
-            month_key = timestamp.strftime('%Y-%m')
+        with open(output_file, 'wb') as raw:
+            f = zstandard.ZstdCompressor(level=3).stream_writer(raw) if compress else raw
+            # Reopen the header object to append records_by_day
+            f.write(dumps(header)[:-1] + b',"records_by_day":{')
             
-            if month_key not in by_month:
-                by_month[month_key] = []
+            for day_index, (date_key, entries) in enumerate(by_day.items()):
+                f.write((b',' if day_index else b'') + dumps(date_key) + b':[')
+                for entry_index, (exact_timestamp, record) in enumerate(entries):
+                    f.write((b',' if entry_index else b'') + self._record_bytes(record, exact_timestamp))
+                f.write(b']')
             
-            by_month[month_key].append(record)
+            f.write(b'}}')
+            if compress:
+                f.close()  # Flushes the zstd frame and closes raw
+    
+    def export_jsonl(self, records: List[BrowserRecord], compress: bool = False) -> Path:
+        """
+        Export all records to one JSON Lines file with month/date partition keys
+        
+        Alternative to export_by_month: one file handle and one pass instead of a
+        file per month. Each line is an exported record plus 'month' and 'date',
+        newest first, so a month is a cheap line filter (jq, ijson, grep).
+        storage_manager.ingest_browser_data reads .jsonl and .jsonl.zst files.
+        
+        Args:
+            records: Records to export
+            compress: Write browser_data_all.jsonl.zst (zstd level 3) instead of .jsonl
+            
+        Returns:
+            Path of the written file
+        """
+        if compress and zstandard is None:
+            print("⚠️  zstandard not installed, writing uncompressed JSON Lines")
+            print("   Install: uv add zstandard")
+            compress = False
+        
+        month_keys, date_keys, exact_timestamps = self._timestamp_keys(records)
+        # One global sort (newest first) replaces the per-month/per-day buckets
+        order = sorted(range(len(records)), key=exact_timestamps.__getitem__, reverse=True)
+        
+        EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        # browser_data_* so the ingest globs in main.py / ingest_all_data.py pick it up
+        output_file = EXPORT_DIR / ("browser_data_all.jsonl.zst" if compress else "browser_data_all.jsonl")
+        
+        with open(output_file, 'wb') as raw:
+            f = zstandard.ZstdCompressor(level=3).stream_writer(raw) if compress else raw
+            for i in order:
+                record_json = self._record_bytes(records[i], exact_timestamps[i])
+                f.write(record_json[:-1] + b',"month":"' + month_keys[i].encode()
+                        + b'","date":"' + date_keys[i].encode() + b'"}\n')
+            if compress:
+                f.close()  # Flushes the zstd frame and closes raw
+        
+        print(f"\n✓ {output_file}: {len(records)} records")
+        return output_file
+    
+    @staticmethod
+    def _timestamp_keys(records: List[BrowserRecord]):
+        """
+        Month key, day key and normalized ISO timestamp for every record
+        
+        Parses all timestamps in one numpy call; falls back to per-record
+        datetime.fromisoformat for anything numpy can't represent (e.g. UTC offsets).
+        
+        Returns:
+            (['YYYY-MM', ...], ['YYYY-MM-DD', ...], [isoformat(), ...])
+        """
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('error')
+                stamps = np.array([record.last_visit_time for record in records], dtype='datetime64[us]')
+        except (ValueError, Warning):
+            month_keys, date_keys, iso_times = [], [], []
+            day_keys = {}  # (year, month, day) -> (month_key, date_key); many records share a day
+            for record in records:
+                ts = datetime.fromisoformat(record.last_visit_time)
+                day = (ts.year, ts.month, ts.day)
+                keys = day_keys.get(day)
+                if keys is None:
+                    keys = day_keys[day] = (f"{ts.year:04d}-{ts.month:02d}", f"{ts.year:04d}-{ts.month:02d}-{ts.day:02d}")
+                month_keys.append(keys[0])
+                date_keys.append(keys[1])
+                iso_times.append(ts.isoformat())
+            return month_keys, date_keys, iso_times
+        
+        iso_times = np.datetime_as_string(stamps, unit='us').tolist()
+        return (
+            np.datetime_as_string(stamps.astype('datetime64[M]')).tolist(),
+            np.datetime_as_string(stamps.astype('datetime64[D]')).tolist(),
+            # Match datetime.isoformat(), which omits zero microseconds
+            [t[:-7] if t.endswith('.000000') else t for t in iso_times],
+        )
+    
+    def export_by_month(self, records: List[BrowserRecord], compress: bool = False):
+        """
+        Export records grouped by month into separate files
+        
+        Args:
+            records: Records to export
+            compress: Write browser_data_YYYY_MM.json.zst (zstd level 3) instead of .json
+        """
+        if compress and zstandard is None:
+            print("⚠️  zstandard not installed, writing uncompressed JSON")
+            print("   Install: uv add zstandard")
+            compress = False
+        
+        # Group by month, then by day, parsing each timestamp once
+        month_keys, date_keys, exact_timestamps = self._timestamp_keys(records)
+        by_month = defaultdict(lambda: defaultdict(list))
+        day_stats = defaultdict(lambda: [0, 0])  # date_key -> [history_count, search_count]
+        
+        for record, month_key, date_key, exact_timestamp in zip(records, month_keys, date_keys, exact_timestamps):
+            # Records stay dataclasses until written
+            by_month[month_key][date_key].append((exact_timestamp, record))
+            
+            stats = day_stats[date_key]
+            if record.record_type == 'history':
+                stats[0] += 1
+            if record.search_query:
+                stats[1] += 1
         
         # Create output directory if it doesn't exist
-        output_dir = Path(__file__).parent.parent.parent / "Data_Storage"
+        output_dir = EXPORT_DIR
         output_dir.mkdir(parents=True, exist_ok=True)
         
         # Export each month to a separate file
         total_files = 0
-        for month_key, month_records in by_month.items():
-            # Group by day within the month
-            by_day = {}
+        summary_lines = []
+        last_updated = datetime.now().isoformat()  # One timestamp for the whole export
+        for month_key, by_day in by_month.items():
+            month_count = sum(len(entries) for entries in by_day.values())
             
-            for record in month_records:
-                timestamp = datetime.fromisoformat(record.last_visit_time)
-                date_key = timestamp.strftime('%Y-%m-%d')
-                
-                if date_key not in by_day:
-                    by_day[date_key] = []
-                
-                # Add record with exact timestamp
-                record_dict = record.to_dict()
-                record_dict['exact_timestamp'] = timestamp.isoformat()
-                record_dict['time_of_day'] = timestamp.strftime('%H:%M:%S')
-                by_day[date_key].append(record_dict)
-            
-            # Sort each day's records by timestamp
+            # Sort each day's records by timestamp. Each browser/profile already
+            # arrives newest-first, so timsort only merges those descending runs.
             for date_key in by_day:
-                by_day[date_key].sort(key=lambda x: x['exact_timestamp'], reverse=True)
+                by_day[date_key].sort(key=_EXACT_TIMESTAMP_OF, reverse=True)
             
             # Create organized output for this month
             year, month = month_key.split('-')
             output_file = output_dir / f"browser_data_{year}_{month}.json"
+            if compress:
+                output_file, stale_file = output_file.with_suffix('.json.zst'), output_file
+            else:
+                stale_file = output_file.with_suffix('.json.zst')
+            
+            # Only one format per month, or the month would be ingested twice
+            if stale_file.exists():
+                stale_file.unlink()
             
-            organized_data = {
+            # Newest day first; ISO dates sort chronologically as strings. Sorted once
+            # for both the date range and the report (browsers interleave days, so
+            # insertion order isn't reliable)
+            days_desc = sorted(by_day, reverse=True)
+            
+            header = {
                 'month': month_key,
-                'total_records': len(month_records),
-                'last_updated': datetime.now().isoformat(),
+                'total_records': month_count,
+                'last_updated': last_updated,
                 'date_range': {
-                    'start': min(by_day.keys()) if by_day else None,
-                    'end': max(by_day.keys()) if by_day else None
-                },
-                'records_by_day': by_day
+                    'start': days_desc[-1] if days_desc else None,
+                    'end': days_desc[0] if days_desc else None
+                }
             }
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(organized_data, f, indent=2, ensure_ascii=False)
+            self._write_month_json(output_file, header, by_day)
+            
+            # Small human-readable companion (not matched by the browser_data_* ingest glob)
+            summary = dict(header, days={
+                date_key: {
+                    'records': len(by_day[date_key]),
+                    'history': day_stats[date_key][0],
+                    'bookmarks': len(by_day[date_key]) - day_stats[date_key][0],
+                    'searches': day_stats[date_key][1],
+                }
+                for date_key in by_day
+            })
+            summary_file = output_dir / f"browser_summary_{year}_{month}.json"
+            summary_file.write_bytes(self._json_bytes(summary, indent=True))
             
-            print(f"\n✓ {output_file}: {len(month_records)} records ({len(by_day)} days)")
+            summary_lines.append(f"\n✓ {output_file}: {month_count} records ({len(by_day)} days)")
             
-            # Print summary for this month
-            for date_key in sorted(by_day.keys(), reverse=True):
+            # Summary for this month
+            for date_key in days_desc:
                 count = len(by_day[date_key])
-                history_count = sum(1 for r in by_day[date_key] if r['record_type'] == 'history')
+                history_count, search_count = day_stats[date_key]
                 bookmark_count = count - history_count
-                search_count = sum(1 for r in by_day[date_key] if r.get('search_query'))
-                print(f"  {date_key}: {count} records (History: {history_count}, Bookmarks: {bookmark_count}, Searches: {search_count})")
+                summary_lines.append(f"  {date_key}: {count} records (History: {history_count}, Bookmarks: {bookmark_count}, Searches: {search_count})")
             
             total_files += 1
         
-        print(f"\n✓ Total: {len(records)} records exported to {total_files} monthly files")
-        print(f"✓ Files will be updated each time you run this script")
+        summary_lines.append(f"\n✓ Total: {len(records)} records exported to {total_files} monthly files")
+        summary_lines.append(f"✓ Files will be updated each time you run this script")
+        
+        # One write for the whole report instead of a print per day
+        sys.stdout.write('\n'.join(summary_lines) + '\n')
 
 
 def main():
@@ -8,11 +8,16 @@ Team members should create:
 - Update requirements.txt with any new dependencies
 """
 
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from typing import List, Dict, Any
 from datetime import datetime
 import json
 
+try:
+    import orjson  # Faster JSON serializer; falls back to stdlib json
+except ImportError:
+    orjson = None
+
 
 @dataclass
 class DataRecord:
@@ -27,7 +32,13 @@ class DataRecord:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
-        return asdict(self)
+        # Plain field copy; asdict() deep-copies through dataclasses.fields()
+        return {
+            'content': self.content,
+            'source_type': self.source_type,
+            'timestamp': self.timestamp,
+            'metadata': dict(self.metadata) if self.metadata is not None else None,
+        }
 
 
 class DataExtractor:
@@ -69,8 +80,12 @@ class DataExtractor:
         """Export records to JSON file"""
         data = [record.to_dict() for record in records]
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
         
         print(f"Exported {len(records)} records to {output_file}")
 
@@ -6,6 +6,16 @@ Run this to verify your browser data extraction works correctly
 from browser_ingestion import BrowserDataExtractor, BrowserRecord
 from datetime import datetime
 
+_extractor = None
+
+
+def get_extractor() -> BrowserDataExtractor:
+    """Shared extractor: profile detection runs once for the whole suite"""
+    global _extractor
+    if _extractor is None:
+        _extractor = BrowserDataExtractor()
+    return _extractor
+
 
 def test_chrome():
     """Test Chrome extraction"""
@@ -13,7 +23,7 @@ def test_chrome():
     print("Testing Chrome Extraction")
     print("=" * 60)
     
-    extractor = BrowserDataExtractor()
+    extractor = get_extractor()
     
     # Test history
     print("\nExtracting Chrome history (last 7 days, max 10 records)...")
@@ -51,7 +61,7 @@ def test_edge():
     print("Testing Edge Extraction")
     print("=" * 60)
     
-    extractor = BrowserDataExtractor()
+    extractor = get_extractor()
     
     # Test history
     print("\nExtracting Edge history (last 7 days, max 10 records)...")
@@ -80,7 +90,7 @@ def test_firefox():
     print("Testing Firefox Extraction")
     print("=" * 60)
     
-    extractor = BrowserDataExtractor()
+    extractor = get_extractor()
     
     # Test history
     print("\nExtracting Firefox history (last 7 days, max 10 records)...")
@@ -109,7 +119,7 @@ def test_full_extraction():
     print("Testing Full Extraction (All Browsers)")
     print("=" * 60)
     
-    extractor = BrowserDataExtractor()
+    extractor = get_extractor()
     all_data = extractor.extract_all(days_back=7, limit_per_browser=20)
     
     total = sum(len(records) for records in all_data.values())
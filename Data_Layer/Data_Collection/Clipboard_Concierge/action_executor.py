@@ -5,16 +5,27 @@
 Executes actions based on classified clipboard intent.
 All actions are performed locally on the user's machine.
 """
+import asyncio
+import atexit
 import os
 import sys
+import threading
 import webbrowser
 import subprocess
 import json
+from collections import deque
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
+from urllib.parse import quote, quote_plus
 import platform
 import re
+import tempfile
+
+try:
+    import orjson  # Faster JSON serializer; falls back to stdlib json
+except ImportError:
+    orjson = None
 
 # Set UTF-8 encoding for Windows console (only if not already wrapped)
 if sys.platform == 'win32' and hasattr(sys.stdout, 'buffer'):
@@ -25,9 +36,128 @@ if sys.platform == 'win32' and hasattr(sys.stdout, 'buffer'):
         sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
 
+# Patterns used by the contact/email/phone/search actions, compiled once
+_EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+_PHONE_RE = re.compile(r'(?:\+?(\d{1,3}))?[-. (]*(\d{3})[-. )]*(\d{3})[-. ]*(\d{4})(?: *x(\d+))?')
+_PHONE_NO_EXT_RE = re.compile(r'(?:\+?(\d{1,3}))?[-. (]*(\d{3})[-. )]*(\d{3})[-. ]*(\d{4})')
+_SO_PREFIX_RE = re.compile(r'^(error:|exception:|traceback)\s*', re.IGNORECASE)
+
+
+# Platform-specific file openers, resolved once
+_SYSTEM = platform.system()
+if _SYSTEM == "Windows":
+    _open_file = os.startfile
+
+    def _show_in_folder(path):
+        subprocess.run(['explorer', '/select,', path])
+elif _SYSTEM == "Darwin":  # macOS
+    def _open_file(path):
+        subprocess.run(['open', path])
+
+    def _show_in_folder(path):
+        subprocess.run(['open', '-R', path])
+else:  # Linux
+    def _open_file(path):
+        subprocess.run(['xdg-open', path])
+
+    def _show_in_folder(path):
+        subprocess.run(['nautilus', path])
+
+
+def _json_bytes(obj) -> bytes:
+    """Pretty-printed UTF-8 JSON (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _dump_json(path: Path, obj) -> None:
+    """Write obj to path as pretty-printed JSON in a single write."""
+    path.write_bytes(_json_bytes(obj))
+
+
+def _load_json(path: Path):
+    """Read a JSON file (orjson when available).
+
+    Raises:
+        json.JSONDecodeError: If the file is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+async def ainput() -> str:
+    """Read a line from stdin without blocking the event loop.
+
+    The read runs on a daemon thread, so other coroutines keep going while
+    the user decides, and Ctrl+C never waits for a pending read to finish.
+
+    Returns:
+        The line read, without the trailing newline
+
+    Raises:
+        EOFError: If stdin is closed
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def _resolve(result, error):
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _read():
+        try:
+            line = input()
+        except (EOFError, KeyboardInterrupt) as e:
+            loop.call_soon_threadsafe(_resolve, None, e)
+        else:
+            loop.call_soon_threadsafe(_resolve, line, None)
+
+    threading.Thread(target=_read, name="concierge-input", daemon=True).start()
+    return await future
+
+
 class ActionExecutor:
     """Executes actions based on classified intent with user confirmation."""
 
+    # behavior.json writes are coalesced: flushed after this much idle time...
+    FLUSH_DELAY_SECONDS = 2.0
+    # ...or once this many rule changes are pending
+    FLUSH_MAX_PENDING = 50
+
+    # Most recent executions kept in memory; older entries are dropped
+    MAX_HISTORY = 500
+
+    # Action name -> method name; only the method actually invoked gets bound
+    _ACTION_DISPATCH = {
+        'create_calendar_event': 'create_calendar_event',
+        'set_reminder': 'create_reminder',
+        'create_reminder': 'create_reminder',
+        'add_to_todo_list': 'add_to_todo_list',
+        'search_stackoverflow': 'search_stackoverflow',
+        'search_google': 'search_google',
+        'search_youtube': 'search_youtube',
+        'search_wikipedia': 'search_wikipedia',
+        'search_github': 'search_github',
+        'search_image': 'search_image',
+        'open_in_browser': 'open_url',
+        'open_url': 'open_url',
+        'open_file': 'open_file',
+        'show_in_folder': 'show_in_folder',
+        'open_file_location': 'show_in_folder',
+        'save_contact': 'save_contact',
+        'save_note': 'save_note',
+        'send_email': 'send_email',
+        'call_phone': 'call_phone',
+        'call_contact': 'call_phone',
+        'extract_text': 'extract_text_from_image',
+    }
+
     def __init__(self, base_dir: Path = None):
         """Initialize the action executor.
 
@@ -38,16 +168,40 @@ class ActionExecutor:
         self.concierge_dir = self.base_dir / "Clipboard_Concierge"
         self.events_dir = self.concierge_dir / "events"
         self.reminders_dir = self.concierge_dir / "reminders"
+        self.contacts_dir = self.concierge_dir / "contacts"
+        self.notes_dir = self.concierge_dir / "notes"
         self.behavior_file = self.concierge_dir / "behavior.json"
 
         self._setup_directories()
         self.auto_execute_rules = self._load_auto_execute_rules()
-        self.execution_history = []
+        self.execution_history = deque(maxlen=self.MAX_HISTORY)
+
+        # Pending auto-execute rule changes not yet written to behavior.json
+        self._pending_changes = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        atexit.register(self.flush)
 
     def _setup_directories(self):
         """Create necessary directories."""
         self.events_dir.mkdir(parents=True, exist_ok=True)
         self.reminders_dir.mkdir(parents=True, exist_ok=True)
+        self.contacts_dir.mkdir(parents=True, exist_ok=True)
+        self.notes_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _new_record_path(directory: Path, kind: str) -> Tuple[datetime, str, Path]:
+        """Timestamp a new record and build its file path.
+
+        Args:
+            directory: Directory the record is saved in (already created)
+            kind: Record kind, used as id and filename prefix
+
+        Returns:
+            Tuple of (now, timestamp, path to <kind>_<timestamp>.json)
+        """
+        now = datetime.now()
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
+        return now, timestamp, directory / f"{kind}_{timestamp}.json"
 
     def _load_auto_execute_rules(self) -> Dict:
         """Load auto-execute rules from behavior tracking."""
@@ -55,19 +209,17 @@ class ActionExecutor:
             return {}
 
         try:
-            with open(self.behavior_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _load_json(self.behavior_file)
             return data.get('auto_execute_rules', {})
         except (json.JSONDecodeError, IOError):
             return {}
 
     def _save_auto_execute_rules(self):
         """Save auto-execute rules to behavior file."""
-        # Load existing data
+        # Re-read: the concierge writes its own keys to the same file
         if self.behavior_file.exists():
             try:
-                with open(self.behavior_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = _load_json(self.behavior_file)
             except (json.JSONDecodeError, IOError):
                 data = {}
         else:
@@ -76,12 +228,46 @@ class ActionExecutor:
         # Update rules
         data['auto_execute_rules'] = self.auto_execute_rules
 
-        # Save
+        # Save atomically (a crash mid-write must not truncate behavior.json)
         self.behavior_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.behavior_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        fd, tmp_path = tempfile.mkstemp(dir=self.behavior_file.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_json_bytes(data))
+            os.replace(tmp_path, self.behavior_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _schedule_flush(self):
+        """Mark rules dirty and (re)start the debounce timer on the running loop."""
+        self._pending_changes += 1
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if self._pending_changes >= self.FLUSH_MAX_PENDING:
+            self.flush()
+            return
+
+        loop = asyncio.get_running_loop()
+        self._flush_handle = loop.call_later(self.FLUSH_DELAY_SECONDS, self.flush)
+
+    def flush(self):
+        """Write pending auto-execute rule changes now (also runs at exit)."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending_changes:
+            return
+
+        try:
+            self._save_auto_execute_rules()
+            self._pending_changes = 0
+        except (IOError, OSError) as e:
+            print(f"[ActionExecutor] Could not save behavior rules: {e}", flush=True)
 
-    def execute_action(
+    async def execute_action(
         self,
         action: str,
         content: str,
@@ -91,6 +277,9 @@ class ActionExecutor:
     ) -> bool:
         """Execute an action with optional confirmation.
 
+        A coroutine: waiting for the y/n/a answer and the blocking work of the
+        action itself (browser launch, file writes) happen off the event loop.
+
         Args:
             action: Action name (e.g., 'search_google')
             content: Clipboard content
@@ -114,14 +303,14 @@ class ActionExecutor:
             print(f">>> Execute this action? (y/n/a=always) ", end='', flush=True)
 
             try:
-                response = input().strip().lower()
+                response = (await ainput()).strip().lower()
                 if response == 'n':
                     print(">>> Skipped", flush=True)
                     return False
                 elif response == 'a':
                     # Remember to auto-execute this action in future
                     self.auto_execute_rules[action_key] = self.auto_execute_rules.get(action_key, 0) + 1
-                    self._save_auto_execute_rules()
+                    self._schedule_flush()
                     print(f">>> Will auto-execute '{action}' in future", flush=True)
                 elif response != 'y':
                     print(">>> Skipped", flush=True)
@@ -133,7 +322,7 @@ class ActionExecutor:
         # Execute the action
         try:
             data = data or {}
-            success = self._execute(action, data, content)
+            success = await self._execute(action, data, content)
             if success:
                 # Track execution
                 self.execution_history.append({
@@ -147,7 +336,7 @@ class ActionExecutor:
                 if action_key not in self.auto_execute_rules:
                     self.auto_execute_rules[action_key] = 0
                 self.auto_execute_rules[action_key] += 1
-                self._save_auto_execute_rules()
+                self._schedule_flush()
 
                 return True
             else:
@@ -157,38 +346,14 @@ class ActionExecutor:
             print(f">>> ✗ Error executing {action}: {e}", flush=True)
             return False
 
-    def _execute(self, action: str, data: Dict, content: str) -> bool:
-        """Execute a specific action."""
-        action_map = {
-            'create_calendar_event': self.create_calendar_event,
-            'set_reminder': self.create_reminder,
-            'create_reminder': self.create_reminder,
-            'add_to_todo_list': self.add_to_todo_list,
-            'search_stackoverflow': self.search_stackoverflow,
-            'search_google': self.search_google,
-            'search_youtube': self.search_youtube,
-            'search_wikipedia': self.search_wikipedia,
-            'search_github': self.search_github,
-            'search_image': self.search_image,
-            'open_in_browser': self.open_url,
-            'open_url': self.open_url,
-            'open_file': self.open_file,
-            'show_in_folder': self.show_in_folder,
-            'open_file_location': self.show_in_folder,
-            'save_contact': self.save_contact,
-            'save_note': self.save_note,
-            'send_email': self.send_email,
-            'call_phone': self.call_phone,
-            'call_contact': self.call_phone,
-            'extract_text': self.extract_text_from_image,
-        }
-
-        action_func = action_map.get(action)
-        if not action_func:
+    async def _execute(self, action: str, data: Dict, content: str) -> bool:
+        """Execute a specific action on a worker thread."""
+        method_name = self._ACTION_DISPATCH.get(action)
+        if not method_name:
             print(f">>> Unknown action: {action}", flush=True)
             return False
 
-        return action_func(data, content)
+        return await asyncio.to_thread(getattr(self, method_name), data, content)
 
     def create_calendar_event(self, data: Dict, content: str) -> bool:
         """Create a calendar event - opens Google Calendar with pre-filled info."""
@@ -196,7 +361,7 @@ class ActionExecutor:
         title = title[:100]  # Limit length
 
         # Open Google Calendar create event page
-        encoded_title = title.replace(' ', '+').replace('&', '%26')
+        encoded_title = quote_plus(title)
         url = f"https://calendar.google.com/calendar/render?action=TEMPLATE&text={encoded_title}"
 
         webbrowser.open(url)
@@ -205,8 +370,7 @@ class ActionExecutor:
 
     def create_reminder(self, data: Dict, content: str) -> bool:
         """Create a reminder with Windows notification."""
-        now = datetime.now()
-        timestamp = now.strftime('%Y%m%d_%H%M%S')
+        now, timestamp, reminder_path = self._new_record_path(self.reminders_dir, "reminder")
 
         reminder_data = {
             "id": f"reminder_{timestamp}",
@@ -217,11 +381,7 @@ class ActionExecutor:
         }
 
         # Save to file
-        reminder_filename = f"reminder_{timestamp}.json"
-        reminder_path = self.reminders_dir / reminder_filename
-
-        with open(reminder_path, 'w', encoding='utf-8') as f:
-            json.dump(reminder_data, f, indent=2, ensure_ascii=False)
+        _dump_json(reminder_path, reminder_data)
 
         print(f">>> Reminder saved: {reminder_data['task'][:60]}...", flush=True)
 
@@ -258,8 +418,8 @@ class ActionExecutor:
         """Search Stack Overflow for error or question."""
         query = data.get('error_query', content)
         # Clean up the query - remove common prefixes
-        query = re.sub(r'^(error:|exception:|traceback)\s*', '', query, flags=re.IGNORECASE)
-        encoded_query = query.replace(' ', '+')
+        query = _SO_PREFIX_RE.sub('', query)
+        encoded_query = quote_plus(query)
         url = f"https://stackoverflow.com/search?q={encoded_query}"
         webbrowser.open(url)
         print(f">>> Searching Stack Overflow for: {query[:50]}...", flush=True)
@@ -268,7 +428,7 @@ class ActionExecutor:
     def search_google(self, data: Dict, content: str) -> bool:
         """Search Google."""
         query = data.get('query', content)
-        encoded_query = query.replace(' ', '+')
+        encoded_query = quote_plus(query)
         url = f"https://www.google.com/search?q={encoded_query}"
         webbrowser.open(url)
         print(f">>> Searching Google for: {query[:50]}...", flush=True)
@@ -277,7 +437,7 @@ class ActionExecutor:
     def search_wikipedia(self, data: Dict, content: str) -> bool:
         """Search Wikipedia."""
         query = data.get('query', content)
-        encoded_query = query.replace(' ', '+')
+        encoded_query = quote_plus(query)
         url = f"https://en.wikipedia.org/wiki/Special:Search?search={encoded_query}"
         webbrowser.open(url)
         print(f">>> Searching Wikipedia for: {query[:50]}...", flush=True)
@@ -286,7 +446,7 @@ class ActionExecutor:
     def search_github(self, data: Dict, content: str) -> bool:
         """Search GitHub for code issues."""
         query = data.get('error_query', content)
-        encoded_query = query.replace(' ', '+')
+        encoded_query = quote_plus(query)
         url = f"https://github.com/search?q={encoded_query}&type=issues"
         webbrowser.open(url)
         print(f">>> Searching GitHub issues for: {query[:50]}...", flush=True)
@@ -340,12 +500,7 @@ class ActionExecutor:
             print(f"[ActionExecutor] File not found: {file_path}")
             return False
 
-        if platform.system() == "Windows":
-            os.startfile(file_path)
-        elif platform.system() == "Darwin":  # macOS
-            subprocess.run(['open', file_path])
-        else:  # Linux
-            subprocess.run(['xdg-open', file_path])
+        _open_file(file_path)
 
         print(f"[ActionExecutor] Opening file: {file_path}")
         return True
@@ -366,20 +521,14 @@ class ActionExecutor:
             print(f"[ActionExecutor] File not found: {file_path}")
             return False
 
-        if platform.system() == "Windows":
-            subprocess.run(['explorer', '/select,', file_path])
-        elif platform.system() == "Darwin":  # macOS
-            subprocess.run(['open', '-R', file_path])
-        else:  # Linux
-            subprocess.run(['nautilus', file_path])
+        _show_in_folder(file_path)
 
         print(f"[ActionExecutor] Showing file in folder: {file_path}")
         return True
 
     def save_contact(self, data: Dict, content: str) -> bool:
         """Parse and save contact information."""
-        now = datetime.now()
-        timestamp = now.strftime('%Y%m%d_%H%M%S')
+        now, timestamp, contact_path = self._new_record_path(self.contacts_dir, "contact")
 
         # Extract contact info from content
         lines = content.strip().split('\n')
@@ -396,22 +545,18 @@ class ActionExecutor:
 
         # Auto-extract email if not in data
         if not contact_data['email']:
-            email_match = re.search(r'[\w.+-]+@[\w-]+\.[\w.-]+', content)
+            email_match = _EMAIL_RE.search(content)
             if email_match:
                 contact_data['email'] = email_match.group()
 
         # Auto-extract phone if not in data
         if not contact_data['phone']:
-            phone_match = re.search(r'(?:\+?(\d{1,3}))?[-. (]*(\d{3})[-. )]*(\d{3})[-. ]*(\d{4})(?: *x(\d+))?', content)
+            phone_match = _PHONE_RE.search(content)
             if phone_match:
                 contact_data['phone'] = phone_match.group()
 
         # Save to file
-        contact_path = self.concierge_dir / "contacts" / f"contact_{timestamp}.json"
-        contact_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(contact_path, 'w', encoding='utf-8') as f:
-            json.dump(contact_data, f, indent=2, ensure_ascii=False)
+        _dump_json(contact_path, contact_data)
 
         print(f">>> Contact saved: {contact_data['name']}", flush=True)
         if contact_data['email']:
@@ -426,7 +571,7 @@ class ActionExecutor:
         # Extract email from content or data
         email = data.get('email', '')
         if not email:
-            email_match = re.search(r'[\w.+-]+@[\w-]+\.[\w.-]+', content)
+            email_match = _EMAIL_RE.search(content)
             if email_match:
                 email = email_match.group()
             else:
@@ -437,7 +582,8 @@ class ActionExecutor:
         lines = content.strip().split('\n')
         subject = lines[0][:100] if lines else content[:100]
 
-        mailto_link = f"mailto:{email}?subject={subject}"
+        # mailto (RFC 6068) wants %20 for spaces, not '+'
+        mailto_link = f"mailto:{email}?subject={quote(subject, safe='')}"
         webbrowser.open(mailto_link)
         print(f">>> Opening email client for: {email}", flush=True)
         return True
@@ -448,7 +594,7 @@ class ActionExecutor:
 
         # Extract phone if not in data
         if not phone:
-            phone_match = re.search(r'(?:\+?(\d{1,3}))?[-. (]*(\d{3})[-. )]*(\d{3})[-. ]*(\d{4})', content)
+            phone_match = _PHONE_NO_EXT_RE.search(content)
             if phone_match:
                 phone = phone_match.group()
             else:
@@ -471,7 +617,7 @@ class ActionExecutor:
     def search_youtube(self, data: Dict, content: str) -> bool:
         """Search YouTube."""
         query = data.get('query', content)
-        encoded_query = query.replace(' ', '+')
+        encoded_query = quote_plus(query)
         url = f"https://www.youtube.com/results?search_query={encoded_query}"
         webbrowser.open(url)
         print(f">>> Searching YouTube for: {query[:50]}...", flush=True)
@@ -479,8 +625,7 @@ class ActionExecutor:
 
     def save_note(self, data: Dict, content: str) -> bool:
         """Save a note to a file."""
-        now = datetime.now()
-        timestamp = now.strftime('%Y%m%d_%H%M%S')
+        now, timestamp, note_path = self._new_record_path(self.notes_dir, "note")
 
         note_data = {
             "id": f"note_{timestamp}",
@@ -491,20 +636,13 @@ class ActionExecutor:
         }
 
         # Save to notes file
-        notes_dir = self.concierge_dir / "notes"
-        notes_dir.mkdir(parents=True, exist_ok=True)
-
-        note_filename = f"note_{timestamp}.json"
-        note_path = notes_dir / note_filename
-
-        with open(note_path, 'w', encoding='utf-8') as f:
-            json.dump(note_data, f, indent=2, ensure_ascii=False)
+        _dump_json(note_path, note_data)
 
         print(f">>> Note saved: {content[:60]}...", flush=True)
         print(f"    Location: {note_path}", flush=True)
 
         # Also append to a master notes.txt file for easy reading
-        notes_txt = notes_dir / "notes.txt"
+        notes_txt = self.notes_dir / "notes.txt"
         with open(notes_txt, 'a', encoding='utf-8') as f:
             f.write(f"\n{'='*70}\n")
             f.write(f"Date: {now.strftime('%Y-%m-%d %H:%M')}\n")
@@ -5,13 +5,14 @@
 Uses Microsoft Phi-2 (2.7B params) - much smarter than GPT-2!
 NOW WITH ACTION EXECUTION - Agent that actually does things!
 """
+import asyncio
 import json
 import time
 import sys
 import torch
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 # Import transformers
 try:
@@ -22,7 +23,7 @@ except ImportError:
     print("[LLM] transformers not installed. Run: pip install transformers torch")
 
 # Import ActionExecutor
-from action_executor import ActionExecutor
+from action_executor import ActionExecutor, ainput
 
 # Configuration
 CLIPBOARD_METADATA = Path(__file__).parent.parent.parent / "Data_Storage" / "Clipboard" / "metadata.json"
@@ -344,20 +345,28 @@ class BetterLLMConcierge:
 
         self._save_behavior()
 
-    def process_clipboard_entry(self, entry: Dict):
-        """Process a clipboard entry with LLM and offer to execute actions."""
+    async def process_clipboard_entry(self, entry: Dict, classification: Optional[Dict] = None):
+        """Process a clipboard entry with LLM and offer to execute actions.
+
+        Args:
+            entry: Clipboard metadata entry
+            classification: Precomputed classify() result (classified here if None)
+        """
         clipboard_id = entry.get('id')
         content_preview = entry.get('content_preview', '')
         content_type = entry.get('content_type', 'text')
 
+        # Classify using LLM (off the event loop)
+        if classification is None:
+            classification = await asyncio.to_thread(
+                self.classifier.classify, content_preview, content_type
+            )
+        intent = classification.get('intent')
+
         print(f"\n{'='*70}", flush=True)
         print(f">>> {content_preview[:80]}", flush=True)
         print(f"{'='*70}", flush=True)
 
-        # Classify using LLM
-        classification = self.classifier.classify(content_preview, content_type)
-        intent = classification.get('intent')
-
         if intent == 'none':
             print(f">>> No clear intent detected", flush=True)
             return
@@ -403,7 +412,7 @@ class BetterLLMConcierge:
         if actions and confidence > 0.7:
             print(f"\n>>> Execute action? (1-{len(actions)}/n/s=skip) ", end='', flush=True)
             try:
-                response = input().strip().lower()
+                response = (await ainput()).strip().lower()
 
                 if response == 'n' or response == 's' or response == 'skip':
                     print(">>> Skipped", flush=True)
@@ -412,7 +421,7 @@ class BetterLLMConcierge:
                     selected_idx = int(response) - 1
                     selected_action = actions[selected_idx]
                     print(f">>> Executing: {action_labels.get(selected_action, selected_action)}", flush=True)
-                    self.executor.execute_action(
+                    await self.executor.execute_action(
                         selected_action,
                         content_preview,
                         confidence,
@@ -421,7 +430,7 @@ class BetterLLMConcierge:
                 elif response == 'y':
                     # Default to first action
                     print(f">>> Executing: {action_labels.get(actions[0], actions[0])}", flush=True)
-                    self.executor.execute_action(
+                    await self.executor.execute_action(
                         actions[0],
                         content_preview,
                         confidence,
@@ -447,30 +456,77 @@ class BetterLLMConcierge:
 
         print(f"[BetterLLM] Started monitoring\n", flush=True)
 
+        try:
+            asyncio.run(self._monitor_async())
+        except KeyboardInterrupt:
+            print(f"\n[BetterLLM] Stopped by user", flush=True)
+            total_classifications = len(self.behavior_data.get("llm_classifications", []))
+            print(f"[BetterLLM] Total LLM classifications: {total_classifications}", flush=True)
+
+    @staticmethod
+    def _read_clipboard_entries() -> List[Dict]:
+        """Load clipboard metadata (empty list if missing or mid-write)."""
+        try:
+            with open(CLIPBOARD_METADATA, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return []
+
+    async def _monitor_async(self):
+        """Poll clipboard metadata and pipeline new entries.
+
+        Classification of the next entries runs while the user is still
+        answering the prompt for an earlier one; prompts stay one at a time.
+        """
+        classify_queue: asyncio.Queue = asyncio.Queue()
+        present_queue: asyncio.Queue = asyncio.Queue()
+        workers = [
+            asyncio.create_task(self._classify_worker(classify_queue, present_queue)),
+            asyncio.create_task(self._present_worker(present_queue)),
+        ]
+
         try:
             while True:
-                # Load clipboard metadata
-                try:
-                    with open(CLIPBOARD_METADATA, 'r', encoding='utf-8') as f:
-                        clipboard_entries = json.load(f)
-                except (json.JSONDecodeError, IOError):
-                    clipboard_entries = []
-
-                # Process new entries
+                clipboard_entries = await asyncio.to_thread(self._read_clipboard_entries)
+
+                # Queue new entries
                 for entry in clipboard_entries:
                     entry_id = entry.get('id')
 
                     if entry_id and entry_id not in self.processed_clipboard_ids:
-                        self.process_clipboard_entry(entry)
                         self.processed_clipboard_ids.add(entry_id)
+                        classify_queue.put_nowait(entry)
 
                 # Sleep before next poll
-                time.sleep(POLL_INTERVAL)
-
-        except KeyboardInterrupt:
-            print(f"\n[BetterLLM] Stopped by user", flush=True)
-            total_classifications = len(self.behavior_data.get("llm_classifications", []))
-            print(f"[BetterLLM] Total LLM classifications: {total_classifications}", flush=True)
+                await asyncio.sleep(POLL_INTERVAL)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self.executor.flush()
+
+    async def _classify_worker(self, classify_queue: asyncio.Queue, present_queue: asyncio.Queue):
+        """Classify queued entries in order, one LLM call at a time."""
+        while True:
+            entry = await classify_queue.get()
+            try:
+                classification = await asyncio.to_thread(
+                    self.classifier.classify,
+                    entry.get('content_preview', ''),
+                    entry.get('content_type', 'text')
+                )
+            except Exception as e:
+                print(f"[BetterLLM] Classification error: {e}", flush=True)
+                continue
+            await present_queue.put((entry, classification))
+
+    async def _present_worker(self, present_queue: asyncio.Queue):
+        """Show classified entries and handle their prompts, one at a time."""
+        while True:
+            entry, classification = await present_queue.get()
+            try:
+                await self.process_clipboard_entry(entry, classification)
+            except Exception as e:
+                print(f"[BetterLLM] Error processing clipboard entry: {e}", flush=True)
 
 
 def main():
@@ -13,8 +13,10 @@ import json
 import sqlite3
 import traceback
 import hashlib
+import heapq
 import re
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from urllib.parse import urlparse, unquote
@@ -37,6 +39,12 @@ class StorageConfig:
     TEXT_DIM = 1024               # BGE-m3 via Ollama
     VISUAL_DIM = 512
     
+    # Visual index (HNSW graph: log-time search for large image libraries)
+    VISUAL_HNSW_M = 32            # Graph neighbors per node
+    VISUAL_HNSW_EF_CONSTRUCTION = 80
+    VISUAL_HNSW_EF_SEARCH = 64    # Raised to top_k when a query asks for more
+    VISUAL_FP16 = True            # Store CLIP vectors as fp16 (half the memory, ~no recall loss)
+    
     # Chunking parameters
     CHUNK_SIZE_SHORT = 512
     CHUNK_SIZE_LONG = 1500
@@ -366,13 +374,25 @@ class VisualVectorStore:
         self.dimension = dimension
         self.index_path = self.index_dir / "faiss_index.bin"
         
-        # Load or create index (use IndexFlatIP for cosine similarity)
+        # Load or create index (inner product on normalized CLIP vectors = cosine)
         if self.index_path.exists():
             self.index = faiss.read_index(str(self.index_path))
             print(f"✅ Loaded visual index: {self.index.ntotal} vectors")
         else:
-            self.index = faiss.IndexFlatIP(dimension)
-            print(f"✅ Created new visual index ({dimension}d)")
+            # Existing IndexFlatIP files keep loading as-is; new ones use HNSW
+            if StorageConfig.VISUAL_FP16:
+                # fp16 scalar quantizer needs no training; vectors are decoded per distance
+                self.index = faiss.IndexHNSWSQ(
+                    dimension, faiss.ScalarQuantizer.QT_fp16,
+                    StorageConfig.VISUAL_HNSW_M, faiss.METRIC_INNER_PRODUCT
+                )
+            else:
+                self.index = faiss.IndexHNSWFlat(
+                    dimension, StorageConfig.VISUAL_HNSW_M, faiss.METRIC_INNER_PRODUCT
+                )
+            self.index.hnsw.efConstruction = StorageConfig.VISUAL_HNSW_EF_CONSTRUCTION
+            storage = "fp16" if StorageConfig.VISUAL_FP16 else "fp32"
+            print(f"✅ Created new visual index ({dimension}d, HNSW, {storage})")
     
     def add(self, embeddings: np.ndarray) -> List[int]:
         """Add embeddings to index"""
@@ -389,6 +409,10 @@ class VisualVectorStore:
         if query_embedding.ndim == 1:
             query_embedding = query_embedding.reshape(1, -1)
         
+        if hasattr(self.index, 'hnsw'):
+            # Search breadth must cover top_k or HNSW returns fewer hits
+            self.index.hnsw.efSearch = max(StorageConfig.VISUAL_HNSW_EF_SEARCH, top_k)
+        
         scores, indices = self.index.search(query_embedding.astype('float32'), top_k)
         return scores[0], indices[0]
     
@@ -419,6 +443,8 @@ class UnifiedStorageManager:
         self._visual_embedding_warning_shown = False
         self._text_embeddings_enabled = False
         self._ingest_error_counts = {}
+        # Bumped on every write so query-result caches can tell they're stale
+        self.generation = 0
         self._init_embeddings()
         self._validate_text_embedding_dimension()
         
@@ -600,13 +626,16 @@ class UnifiedStorageManager:
 
             # Add memory item
             memory_id = self.metadata_store.add_memory_item(source, text, metadata, content_hash=content_hash)
+            self.generation += 1
 
             # Check if chunking needed
             if self.text_processor.should_chunk(text):
-                # Chunk text
-                chunks = self.text_processor.chunk_text(text)
+                # Chunk boundaries only; each chunk is sliced right before encoding
+                spans = self.text_processor.chunk_spans(text)
 
-                for i, (chunk_text, start_pos, end_pos) in enumerate(chunks):
+                for i, (start_pos, end_pos) in enumerate(spans):
+                    chunk_text = self.text_processor.get_chunk(text, start_pos, end_pos)
+                    
                     # Encode chunk
                     embedding = self.embeddings.encode_text(chunk_text)
                     if not np.isfinite(embedding).all():
@@ -646,14 +675,25 @@ class UnifiedStorageManager:
         Ingest browser data from JSON file
         
         Args:
-            json_path: Path to browser data JSON
+            json_path: Path to browser data JSON (.json/.jsonl, optionally zstd-compressed .zst)
             
         Returns:
             Number of items ingested
         """
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            if str(json_path).endswith('.zst'):
+                import zstandard
+                with open(json_path, 'rb') as f:
+                    raw = zstandard.ZstdDecompressor().stream_reader(f).read()
+            else:
+                with open(json_path, 'rb') as f:
+                    raw = f.read()
+            
+            # JSON Lines (export_jsonl) is read as a flat list of records
+            if str(json_path).endswith(('.jsonl', '.jsonl.zst')):
+                data = [json.loads(line) for line in raw.splitlines() if line.strip()]
+            else:
+                data = json.loads(raw)
             
             count = 0
             skipped = 0
@@ -759,6 +799,7 @@ class UnifiedStorageManager:
             
             # Add to visual store
             vector_ids = self.visual_store.add(embedding)
+            self.generation += 1
             
             # Add to metadata
             visual_id = self.metadata_store.add_visual_item(image_path_resolved, ocr_text, metadata, vector_ids[0], image_hash=image_hash)
@@ -773,7 +814,22 @@ class UnifiedStorageManager:
             print(f"❌ Error ingesting image: {e}")
             return -1
     
-    def search(self, query: str, top_k: int = 5, search_type: str = 'text') -> List[Dict]:
+    def embed_query(self, query: str) -> Optional[np.ndarray]:
+        """
+        Text embedding for a search query
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            Query embedding, or None if text embeddings are unavailable
+        """
+        if not self._text_embeddings_ready():
+            return None
+        return self.embeddings.encode_text(query)
+    
+    def search(self, query: str, top_k: int = 5, search_type: str = 'text',
+               query_embedding: Optional[np.ndarray] = None) -> List[Dict]:
         """
         Search storage
         
@@ -781,6 +837,7 @@ class UnifiedStorageManager:
             query: Search query
             top_k: Number of results
             search_type: 'text', 'visual', or 'both'
+            query_embedding: Precomputed text embedding of query (skips encoding)
             
         Returns:
             List of results with scores
@@ -791,8 +848,8 @@ class UnifiedStorageManager:
         # Text search
         if search_type in ['text', 'both']:
             if self._text_embeddings_ready():
-                query_embedding = self.embeddings.encode_text(query)
-                distances, indices = self.text_store.search(query_embedding, top_k)
+                text_embedding = query_embedding if query_embedding is not None else self.embeddings.encode_text(query)
+                distances, indices = self.text_store.search(text_embedding, top_k)
             else:
                 distances, indices = [], []
             
@@ -822,8 +879,8 @@ class UnifiedStorageManager:
         # Visual search
         if search_type in ['visual', 'both']:
             if self._visual_embeddings_ready():
-                query_embedding = self.embeddings.encode_text_for_image_search(query)
-                scores, indices = self.visual_store.search(query_embedding, top_k)
+                visual_embedding = self.embeddings.encode_text_for_image_search(query)
+                scores, indices = self.visual_store.search(visual_embedding, top_k)
             else:
                 scores, indices = [], []
 
@@ -856,10 +913,15 @@ class UnifiedStorageManager:
 
             results.extend(best_by_path.values())
         
-        # Sort by score
-        results.sort(key=lambda x: x['score'], reverse=True)
+        # Partial selection of the best top_k (same order as a full sort + slice)
+        top = heapq.nlargest(top_k, results, key=itemgetter('score'))
         
-        return results[:top_k]
+        # Stable content-addressed IDs + retrieval rank, so prompt assembly can
+        # keep chunk order fixed and reuse per-chunk KV cache entries downstream
+        for rank, result in enumerate(top):
+            result['chunk_id'] = self._compute_hash(result.get('text') or f"{result['type']}:{result['vector_id']}")[:16]
+            result['rank'] = rank
+        return top
     
     def save(self):
         """Save all indices to disk"""
@@ -0,0 +1,157 @@
+"""
+Test Browser Ingestion
+Search-query extraction and the monthly export format
+"""
+
+from pathlib import Path
+from datetime import datetime
+from urllib.parse import urlparse, parse_qs, unquote
+import json
+import random
+import sys
+
+import pytest
+
+# Add the browser collector to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "Data_Layer" / "Data_Collection" / "Browser"))
+
+import browser_ingestion
+from browser_ingestion import BrowserDataExtractor, BrowserRecord
+
+
+@pytest.fixture
+def extractor(tmp_path, monkeypatch):
+    # No browser profiles: point the Windows profile roots at an empty directory
+    monkeypatch.setenv('APPDATA', str(tmp_path))
+    monkeypatch.setenv('LOCALAPPDATA', str(tmp_path))
+    return BrowserDataExtractor()
+
+
+def reference_search_query(url, search_params):
+    """Original urlparse/parse_qs implementation"""
+    try:
+        params = parse_qs(urlparse(url).query)
+        for param in search_params:
+            if param in params and params[param]:
+                return unquote(params[param][0])
+        return None
+    except:
+        return None
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.google.com/search?q=python+asyncio&oq=python",
+    "https://www.google.com/search?q=c%2B%2B%20tutorial",
+    "https://duckduckgo.com/?t=h_&q=%2525done",
+    "https://example.com/?s=first&q=second",
+    "https://example.com/?q=&query=fallback",
+    "https://example.com/?q=one&q=two",
+    "https://example.com/?q%20=padded&q+=plus",
+    "https://example.com/page#section?q=fragment",
+    "https://example.com/?q=a;b&k=c",
+    "https://example.com/?searchTerm=%E2%9C%93",
+    "https://example.com/?q=tab\tbed",
+    "https://example.com/no/query",
+    "https://example.com/?keyword",
+    "http://[::1]:8080/?q=ipv6",
+    "http://[::1/?q=broken",
+    "http://host]/?q=bracket",
+    "",
+])
+def test_extract_search_query_matches_reference(extractor, url):
+    assert extractor._extract_search_query(url) == reference_search_query(url, extractor.search_params)
+
+
+def test_extract_search_query_matches_reference_fuzzed(extractor):
+    rng = random.Random(42)
+    names = extractor.search_params + ['oq', 'Q', 'q%20', 'qu%65ry', 'sea+rch', '']
+    values = ['', 'x', 'a+b', '%20', '%2B', '%25', '%zz', 'caf%C3%A9', '%E2%9C', '=', 'a=b']
+    prefixes = ['https://example.com/', 'https://example.com/path?', 'http://[::1]/?', 'x?', '?', '#?']
+    for _ in range(5000):
+        pairs = []
+        for _ in range(rng.randint(0, 5)):
+            pair = rng.choice(names)
+            if rng.random() < 0.8:
+                pair += '=' + ''.join(rng.choice(values) for _ in range(rng.randint(0, 3)))
+            pairs.append(pair)
+        url = rng.choice(prefixes) + rng.choice(['&', ';', '&&']).join(pairs)
+        if rng.random() < 0.2:
+            url += '#' + rng.choice(['frag', 'q=hidden'])
+        assert extractor._extract_search_query(url) == reference_search_query(url, extractor.search_params), url
+
+
+def make_records():
+    return [
+        BrowserRecord("https://a.example/", "A", 3, "2024-01-15T09:30:00", "history", "chrome (Default)"),
+        BrowserRecord("https://www.google.com/search?q=numpy", "numpy - Google", 1,
+                      "2024-01-15T18:05:12.250000", "history", "chrome (Default)", search_query="numpy"),
+        BrowserRecord("https://b.example/", "B", 0, "2024-01-16T07:00:00", "bookmark", "edge (Default)",
+                      folder="Work", tags=["docs"]),
+        BrowserRecord("https://c.example/", "Ünïcode \"quoted\"", 2, "2024-01-15T12:00:00.000001",
+                      "history", "firefox"),
+        BrowserRecord("https://d.example/", "D", 1, "2024-02-01T00:00:00", "history", "chrome (Profile 1)"),
+    ]
+
+
+def reference_month_document(records, month_key):
+    """Monthly document as the original export_by_month built it (minus last_updated)"""
+    by_day = {}
+    for record in records:
+        timestamp = datetime.fromisoformat(record.last_visit_time)
+        if timestamp.strftime('%Y-%m') != month_key:
+            continue
+        record_dict = record.to_dict()
+        record_dict['exact_timestamp'] = timestamp.isoformat()
+        record_dict['time_of_day'] = timestamp.strftime('%H:%M:%S')
+        by_day.setdefault(timestamp.strftime('%Y-%m-%d'), []).append(record_dict)
+    for entries in by_day.values():
+        entries.sort(key=lambda x: x['exact_timestamp'], reverse=True)
+    return {
+        'month': month_key,
+        'total_records': sum(len(entries) for entries in by_day.values()),
+        'date_range': {'start': min(by_day), 'end': max(by_day)},
+        'records_by_day': by_day,
+    }
+
+
+def test_export_by_month_writes_one_file_per_month(extractor, tmp_path, monkeypatch, capsys):
+    export_dir = tmp_path / "Data_Storage"
+    monkeypatch.setattr(browser_ingestion, 'EXPORT_DIR', export_dir)
+    records = make_records()
+
+    extractor.export_by_month(records)
+
+    assert sorted(p.name for p in export_dir.iterdir()) == [
+        "browser_data_2024_01.json", "browser_data_2024_02.json",
+        "browser_summary_2024_01.json", "browser_summary_2024_02.json",
+    ]
+    for month_key in ("2024-01", "2024-02"):
+        year, month = month_key.split('-')
+        document = json.loads((export_dir / f"browser_data_{year}_{month}.json").read_text(encoding='utf-8'))
+        datetime.fromisoformat(document.pop('last_updated'))
+        assert document == reference_month_document(records, month_key)
+
+    assert "Total: 5 records exported to 2 monthly files" in capsys.readouterr().out
+
+
+def test_export_by_month_summary_counts(extractor, tmp_path, monkeypatch):
+    monkeypatch.setattr(browser_ingestion, 'EXPORT_DIR', tmp_path)
+    extractor.export_by_month(make_records())
+
+    summary = json.loads((tmp_path / "browser_summary_2024_01.json").read_text(encoding='utf-8'))
+    assert summary['total_records'] == 4
+    assert summary['days'] == {
+        '2024-01-15': {'records': 3, 'history': 3, 'bookmarks': 0, 'searches': 1},
+        '2024-01-16': {'records': 1, 'history': 0, 'bookmarks': 1, 'searches': 0},
+    }
+
+
+def test_export_by_month_replaces_other_format(extractor, tmp_path, monkeypatch):
+    monkeypatch.setattr(browser_ingestion, 'EXPORT_DIR', tmp_path)
+    stale = tmp_path / "browser_data_2024_02.json.zst"
+    stale.write_bytes(b"old")
+
+    extractor.export_by_month(make_records())
+
+    assert not stale.exists()
+    assert (tmp_path / "browser_data_2024_02.json").exists()
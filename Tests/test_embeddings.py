@@ -0,0 +1,192 @@
+"""
+Test Embeddings
+Request coalescing in BatchScheduler and the text embedding disk cache
+"""
+
+from pathlib import Path
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+# embeddings imports the CLIP stack at module level
+pytest.importorskip("torch")
+pytest.importorskip("PIL")
+pytest.importorskip("transformers")
+
+# Add Core to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "Core"))
+
+import embeddings
+from embeddings import BatchScheduler, DiskEmbeddingCache, EmbeddingManager
+
+
+def fake_embed(texts):
+    """One row per text, [length, first char code]; always exact"""
+    return np.array([[len(t), ord(t[0]) if t else 0] for t in texts], dtype=np.float32), True
+
+
+class RecordingEmbedder:
+    """embed_fn that records its calls and can hold the first one until released"""
+
+    def __init__(self, hold_first=False, inexact_if=None):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        if not hold_first:
+            self.release.set()
+        self.inexact_if = inexact_if
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        self.started.set()
+        self.release.wait(5)
+        embedded, _ = fake_embed(texts)
+        exact = not (self.inexact_if and any(self.inexact_if(t) for t in texts))
+        return embedded, exact
+
+
+def test_lone_request_is_not_held_for_the_window():
+    scheduler = BatchScheduler(fake_embed, window_ms=10_000)
+    try:
+        embedded, exact = scheduler.submit(["hello"]).result(timeout=2)
+        assert exact
+        np.testing.assert_array_equal(embedded, [[5, ord('h')]])
+    finally:
+        scheduler.close()
+
+
+def test_concurrent_requests_share_one_call():
+    embed_fn = RecordingEmbedder(hold_first=True)
+    scheduler = BatchScheduler(embed_fn, window_ms=10_000, max_batch=3)
+    try:
+        first = scheduler.submit(["a"])
+        assert embed_fn.started.wait(2)
+        # Queued while the worker is busy, then collected together
+        second = scheduler.submit(["bb", "ccc"])
+        third = scheduler.submit(["dddd"])
+        embed_fn.release.set()
+
+        assert first.result(timeout=2)[0].tolist() == [[1, ord('a')]]
+        assert second.result(timeout=2)[0].tolist() == [[2, ord('b')], [3, ord('c')]]
+        assert third.result(timeout=2)[0].tolist() == [[4, ord('d')]]
+        assert embed_fn.calls == [["a"], ["bb", "ccc", "dddd"]]
+    finally:
+        scheduler.close()
+
+
+def test_inexact_batch_is_served_per_request():
+    embed_fn = RecordingEmbedder(hold_first=True, inexact_if=lambda t: t == "too long")
+    scheduler = BatchScheduler(embed_fn, window_ms=10_000, max_batch=3)
+    try:
+        scheduler.submit(["warm-up"])
+        assert embed_fn.started.wait(2)
+        ok = scheduler.submit(["fine"])
+        bad = scheduler.submit(["too long"])
+        other = scheduler.submit(["also fine"])
+        embed_fn.release.set()
+
+        assert ok.result(timeout=2)[1] is True
+        assert bad.result(timeout=2)[1] is False
+        assert other.result(timeout=2)[1] is True
+        assert embed_fn.calls[1:] == [["fine", "too long", "also fine"], ["fine"], ["too long"], ["also fine"]]
+    finally:
+        scheduler.close()
+
+
+def test_failing_request_does_not_fail_others():
+    def embed_fn(texts):
+        if "bad" in texts:
+            raise ValueError("unsupported input")
+        return fake_embed(texts)
+
+    gate = threading.Event()
+    started = threading.Event()
+
+    def held_embed(texts):
+        if texts == ["hold"]:
+            started.set()
+            gate.wait(5)
+        return embed_fn(texts)
+
+    scheduler = BatchScheduler(held_embed, window_ms=10_000, max_batch=2)
+    try:
+        scheduler.submit(["hold"])
+        assert started.wait(2)
+        good = scheduler.submit(["good"])
+        bad = scheduler.submit(["bad"])
+        gate.set()
+
+        assert good.result(timeout=2)[1] is True
+        with pytest.raises(ValueError):
+            bad.result(timeout=2)
+    finally:
+        scheduler.close()
+
+
+def test_close_serves_queued_requests_then_rejects_new_ones():
+    embed_fn = RecordingEmbedder(hold_first=True)
+    scheduler = BatchScheduler(embed_fn, window_ms=1)
+    first = scheduler.submit(["a"])
+    assert embed_fn.started.wait(2)
+    queued = scheduler.submit(["b"])
+    embed_fn.release.set()
+    scheduler.close()
+
+    assert first.done() and queued.done()
+    assert queued.result()[0].tolist() == [[1, ord('b')]]
+    assert not scheduler._worker.is_alive()
+    with pytest.raises(RuntimeError):
+        scheduler.submit(["c"])
+    scheduler.close()  # Idempotent
+
+
+class FakeOllamaClient:
+    """ollama.Client stand-in: fails on texts longer than max_chars"""
+
+    def __init__(self, max_chars=None):
+        self.max_chars = max_chars
+        self.inputs = []
+
+    def embed(self, model, input):
+        self.inputs.append(list(input))
+        if self.max_chars is not None and any(len(t) > self.max_chars for t in input):
+            raise RuntimeError("input length exceeds the context length")
+        return {"embeddings": [[float(len(t)), 1.0] for t in input]}
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """EmbeddingManager with only the Ollama text path wired up (no model downloads)"""
+    manager = object.__new__(EmbeddingManager)
+    manager._ollama = FakeOllamaClient(max_chars=1000)
+    manager._batcher = BatchScheduler(manager._embed_via_ollama)
+    manager._embed_cache = DiskEmbeddingCache(tmp_path / "embedding_cache.db")
+    yield manager
+    manager._batcher.close()
+    manager._embed_cache.close()
+
+
+def test_encode_text_caches_exact_embeddings(manager):
+    first = manager.encode_text(["short text"], normalize=False)
+    second = manager.encode_text(["short text"], normalize=False)
+
+    np.testing.assert_array_equal(first, second)
+    assert manager._ollama.inputs == [["short text"]]
+
+
+def test_truncated_fallback_is_not_cached(manager):
+    long_text = "x" * 2000
+    key = manager._text_cache_key(long_text)
+
+    truncated = manager.encode_text([long_text], normalize=False)
+    assert truncated.tolist() == [[600.0, 1.0]]
+    assert manager._ollama.inputs == [[long_text], ["x" * 600]]
+    assert manager._embed_cache.get_many([key], EmbeddingManager.TEXT_MODEL) == {}
+
+    # Once the backend accepts the full text, its exact embedding is used and cached
+    manager._ollama.max_chars = None
+    exact = manager.encode_text([long_text], normalize=False)
+    assert exact.tolist() == [[2000.0, 1.0]]
+    assert key in manager._embed_cache.get_many([key], EmbeddingManager.TEXT_MODEL)
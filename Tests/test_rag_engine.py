@@ -0,0 +1,116 @@
+"""
+Test RAG Engine query cache
+Exact (TTL/LRU/generation) and semantic lookups of QueryCache
+"""
+
+from pathlib import Path
+import sys
+import time
+
+import numpy as np
+import pytest
+
+# Add Core to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "Core"))
+
+from rag_engine import QueryCache
+
+
+RESULTS = [{'text': 'cached document', 'score': 0.9}]
+
+
+def key(query, top_k=5, search_type='text', filters=None):
+    return QueryCache.make_key(query, top_k, search_type, filters)
+
+
+def unit_vector(seed, dim=32):
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_exact_hit_and_miss():
+    cache = QueryCache()
+    assert cache.get(key("what is ai")) is None
+    cache.put(key("what is ai"), RESULTS)
+    assert cache.get(key("  what is ai ")) == RESULTS
+    assert cache.get(key("what is ai", top_k=10)) is None
+    assert cache.get(key("what is ai", filters={'source': 'browser'})) is None
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['size']) == (1, 3, 1)
+
+
+def test_entries_expire_after_ttl():
+    cache = QueryCache(ttl_seconds=0.05)
+    cache.put(key("q"), RESULTS)
+    assert cache.peek(key("q")) == RESULTS
+    time.sleep(0.1)
+    assert cache.get(key("q")) is None
+    assert cache.stats()['size'] == 0
+
+
+def test_stale_generation_is_a_miss():
+    cache = QueryCache()
+    cache.put(key("q"), RESULTS, generation=1)
+    assert cache.get(key("q"), generation=1) == RESULTS
+    assert cache.get(key("q"), generation=2) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(max_size=2)
+    cache.put(key("a"), RESULTS)
+    cache.put(key("b"), RESULTS)
+    assert cache.get(key("a")) == RESULTS  # 'b' is now least recently used
+    cache.put(key("c"), RESULTS)
+
+    assert cache.peek(key("a")) == RESULTS
+    assert cache.peek(key("b")) is None
+    assert cache.peek(key("c")) == RESULTS
+
+
+def test_semantic_hit_for_near_duplicate_query():
+    cache = QueryCache(similarity_threshold=0.95)
+    embedding = unit_vector(0)
+    cache.put(key("what is machine learning"), RESULTS, embedding=embedding)
+
+    near = embedding + 0.01 * unit_vector(1)
+    assert cache.get(key("what's machine learning?"), embed_fn=lambda: near) == RESULTS
+    assert cache.semantic_hits == 1
+
+
+def test_semantic_lookup_respects_threshold_and_parameters():
+    cache = QueryCache(similarity_threshold=0.95)
+    embedding = unit_vector(0)
+    cache.put(key("what is machine learning"), RESULTS, embedding=embedding)
+
+    assert cache.get(key("unrelated"), embed_fn=lambda: unit_vector(2)) is None
+    assert cache.get(key("what's machine learning?", top_k=3), embed_fn=lambda: embedding) is None
+    assert cache.semantic_hits == 0
+
+
+def test_embed_fn_only_called_after_exact_miss():
+    cache = QueryCache()
+    cache.put(key("q"), RESULTS, embedding=unit_vector(0))
+
+    def embed_fn():
+        raise AssertionError("embedded on an exact hit")
+
+    assert cache.get(key("q"), embed_fn=embed_fn) == RESULTS
+
+
+def test_semantic_ring_buffer_forgets_oldest_embedding():
+    cache = QueryCache(semantic_size=2)
+    cache.put(key("first"), RESULTS, embedding=unit_vector(0))
+    cache.put(key("second"), RESULTS, embedding=unit_vector(1))
+    cache.put(key("third"), RESULTS, embedding=unit_vector(2))
+
+    assert cache.get(key("first again"), embed_fn=lambda: unit_vector(0)) is None
+    assert cache.get(key("third again"), embed_fn=lambda: unit_vector(2)) == RESULTS
+
+
+def test_clear_drops_entries_and_embeddings():
+    cache = QueryCache()
+    cache.put(key("q"), RESULTS, embedding=unit_vector(0))
+    cache.clear()
+    assert cache.get(key("q"), embed_fn=lambda: unit_vector(0)) is None
+    assert cache.stats()['size'] == 0
@@ -0,0 +1,114 @@
+"""
+Test Text Processor
+Pin chunk_text/chunk_spans to the original chunking algorithm
+"""
+
+from pathlib import Path
+import random
+import re
+import sys
+
+import pytest
+
+# Add Core to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "Core"))
+
+from text_processor import TextProcessor
+
+
+def reference_chunk_text(text, chunk_size=None, overlap=None):
+    """Original chunk_text (slices and re-scans every window)"""
+    if chunk_size is None:
+        chunk_size = TextProcessor.CHUNK_SIZE_LONG
+    if overlap is None:
+        overlap = TextProcessor.CHUNK_OVERLAP
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be > 0")
+
+    overlap = max(0, min(overlap, chunk_size - 1))
+
+    if len(text) <= chunk_size:
+        return [(text, 0, len(text))]
+
+    chunks = []
+    start = 0
+
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        chunk = text[start:end]
+
+        if end < len(text):
+            search_start = max(0, len(chunk) - 200)
+            sentence_breaks = [m.end() for m in re.finditer(r'[.!?]\s+', chunk[search_start:])]
+
+            if sentence_breaks:
+                break_pos = search_start + sentence_breaks[-1]
+                chunk = chunk[:break_pos]
+                end = start + break_pos
+
+        clean_chunk = chunk.strip()
+        if clean_chunk:
+            chunks.append((clean_chunk, start, end))
+
+        if end >= len(text):
+            break
+
+        next_start = end - overlap
+        if next_start <= start:
+            next_start = start + 1
+        start = next_start
+
+    return chunks
+
+
+def random_text(rng: random.Random) -> str:
+    """Text dense in sentence breaks, whitespace runs and blank stretches"""
+    alphabet = rng.choice(["ab .!?\n", "abc. ", "x!? \t\n\r", "word. Word? End!  \n\n"])
+    length = rng.choice([0, 1, 5, rng.randint(0, 400), rng.randint(200, 2500)])
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+
+@pytest.fixture
+def processor():
+    return TextProcessor()
+
+
+def test_chunk_text_matches_reference_fuzzed(processor):
+    rng = random.Random(1234)
+    for _ in range(3000):
+        text = random_text(rng)
+        chunk_size = rng.choice([None, 1, 2, rng.randint(1, 50), rng.randint(50, 600)])
+        overlap = rng.choice([None, 0, -3, rng.randint(0, 300), 10_000])
+        assert processor.chunk_text(text, chunk_size, overlap) == reference_chunk_text(text, chunk_size, overlap), \
+            (text, chunk_size, overlap)
+
+
+def test_chunk_text_defaults_match_reference(processor):
+    text = ("First sentence here. Second one follows!  Is this third? " * 120).strip()
+    assert processor.chunk_text(text) == reference_chunk_text(text)
+
+
+def test_chunk_spans_slice_to_chunk_text(processor):
+    rng = random.Random(99)
+    for _ in range(300):
+        text = random_text(rng)
+        chunk_size = rng.randint(1, 300)
+        overlap = rng.randint(0, 100)
+        if len(text) <= chunk_size:
+            continue
+        spans = processor.chunk_spans(text, chunk_size, overlap)
+        chunks = [(processor.get_chunk(text, start, end), start, end) for start, end in spans]
+        assert chunks == processor.chunk_text(text, chunk_size, overlap)
+
+
+@pytest.mark.parametrize("text", ["", "short", "x" * 100])
+def test_invalid_chunk_size_raises(processor, text):
+    with pytest.raises(ValueError):
+        processor.chunk_text(text, chunk_size=0)
+    with pytest.raises(ValueError):
+        reference_chunk_text(text, chunk_size=0)
+
+
+def test_short_text_returned_unstripped(processor):
+    assert processor.chunk_text("  padded  ") == [("  padded  ", 0, 10)]
@@ -48,7 +48,12 @@ class DataIngestionPipeline:
         print("\n📊 Ingesting Browser Data...")
         print("-" * 70)
         
-        browser_files = list(self.storage_dir.glob("browser_data_*.json"))
+        browser_files = [
+            file
+            for pattern in ("browser_data_*.json", "browser_data_*.json.zst",
+                            "browser_data_*.jsonl", "browser_data_*.jsonl.zst")
+            for file in self.storage_dir.glob(pattern)
+        ]
         
         if not browser_files:
             print("   ⚠️  No browser data files found")
@@ -42,7 +42,12 @@ def ingest_data_to_storage():
         
         # Find and ingest browser data
         storage_dir = Path(__file__).parent / "Data_Layer" / "Data_Storage"
-        browser_files = list(storage_dir.glob("browser_data_*.json"))
+        browser_files = [
+            file
+            for pattern in ("browser_data_*.json", "browser_data_*.json.zst",
+                            "browser_data_*.jsonl", "browser_data_*.jsonl.zst")
+            for file in storage_dir.glob(pattern)
+        ]
         
         total = 0
         for file in browser_files: